@@ -0,0 +1,247 @@
+import mmap
+import struct
+
+import numpy as np
+
+from record import RoundRecord
+
+# The header of a round archive, followed by the number of players, the
+# number of card slots per hand and the number of decks, each an unsigned
+# 16-bit integer, and padding up to HEADER_SIZE bytes.
+_FILE_MAGIC = b'BJRA1'
+_HEADER = struct.Struct('<5s3H')
+HEADER_SIZE = 16
+
+# The card code of an empty card slot.
+NO_CARD = 255
+
+
+def max_hand_size(num_decks):
+    """Gets the largest number of cards a hand can end with.
+
+    A hand keeps hitting while its hard total is at most 21, so the
+    longest hand is made of the lowest cards of the shoe, plus the card
+    that makes it bust.
+
+    Args:
+        num_decks (int): The number of decks in the shoe.
+
+    Returns:
+        int: The largest number of cards in a hand.
+
+    """
+    hard_total = 0
+    num_cards = 0
+    for value in range(1, 11):
+        for _ in range(4 * num_decks * (4 if value == 10 else 1)):
+            if hard_total + value > 21:
+                return num_cards + 1
+            hard_total += value
+            num_cards += 1
+    return num_cards
+
+
+def record_dtype(num_players, max_cards):
+    """Gets the NumPy layout of an archived round.
+
+    A round is stored with fixed width: the seed, the code of every card
+    of each player (NO_CARD in the empty slots), the number of hits of
+    each player but the dealer, and the final score, bust flag and winner
+    flag of each player. The dealer is the last player.
+
+    Args:
+        num_players (int): The number of players, the dealer included.
+        max_cards (int): The number of card slots per hand.
+
+    Returns:
+        :obj:`numpy.dtype`: The packed structured type of a round.
+
+    """
+    return np.dtype([('seed', '<u8'),
+                     ('cards', 'u1', (num_players, max_cards)),
+                     ('hits', 'u1', (num_players - 1,)),
+                     ('scores', 'u1', (num_players,)),
+                     ('busts', '?', (num_players,)),
+                     ('winners', '?', (num_players,))])
+
+
+class RecordWriter:
+    """A buffered writer of rounds to a binary archive.
+
+    Rounds are packed into a preallocated buffer, which is written to the
+    file in one go whenever it is full, so archiving a round costs no
+    system call. The rounds must be dealt from their own seed, see
+    Engine.record, so that they can be replayed.
+
+    Attributes:
+        num_players (int): The number of players, the dealer included.
+        num_decks (int): The number of decks in the shoe.
+        max_cards (int): The number of card slots per hand.
+        buffer_size (int): The number of rounds buffered before writing.
+        rounds_written (int): The number of rounds written so far, buffered
+            ones included.
+
+    """
+
+    def __init__(self, path, num_players, num_decks=1, buffer_size=65536):
+        """Constructs an instance of RecordWriter and writes the archive header.
+
+        Args:
+            path (str): The path of the archive. An existing file is replaced.
+            num_players (int): The number of players, the dealer included.
+            num_decks (int): The number of decks in the shoe (default to be 1).
+            buffer_size (int): The number of rounds buffered before writing
+                (default to be 65536).
+
+        """
+        self.num_players = num_players
+        self.num_decks = num_decks
+        self.max_cards = max_hand_size(num_decks)
+        self.buffer_size = buffer_size
+        self.rounds_written = 0
+        num_slots = num_players * self.max_cards
+        self._struct = struct.Struct('<Q{}B{}B{}B{}?{}?'.format(
+            num_slots, num_players - 1, num_players, num_players, num_players))
+        self._empty_cards = [NO_CARD] * num_slots
+        self._buffer = bytearray(self._struct.size * buffer_size)
+        self._count = 0
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(_FILE_MAGIC, num_players, self.max_cards, num_decks).ljust(HEADER_SIZE, b'\0'))
+
+    def write(self, result):
+        """Archives a round.
+
+        Args:
+            result (:obj:`RoundResult`): The outcome of the round.
+
+        Raises:
+            ValueError: If the round has no seed, or was not played by the
+                number of players of the archive.
+
+        """
+        if result.seed is None:
+            raise ValueError("Only a round dealt from its own seed can be archived!")
+        if len(result.scores) != self.num_players:
+            raise ValueError("The round has {} players, the archive {}!".format(len(result.scores), self.num_players))
+        max_cards = self.max_cards
+        cards = list(self._empty_cards)
+        for seat, hands in enumerate(result.cards):
+            start = seat * max_cards
+            cards[start:start + len(hands)] = [card.code for card in hands]
+        winners = result.winners
+        self._struct.pack_into(self._buffer, self._count * self._struct.size, result.seed, *cards, *result.hits,
+                               *result.scores, *result.busts, *[name in winners for name in result.player_names])
+        self._count += 1
+        self.rounds_written += 1
+        if self._count == self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered rounds to the file."""
+        if self._count:
+            self._file.write(memoryview(self._buffer)[:self._count * self._struct.size])
+            self._count = 0
+        self._file.flush()
+
+    def close(self):
+        """Writes the buffered rounds and closes the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        """Enters a context that closes the writer on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the writer."""
+        self.close()
+
+
+class RecordReader:
+    """A reader of a binary archive, memory-mapped rather than read.
+
+    The rounds are exposed as a NumPy structured array (see record_dtype)
+    that is a view of the mapped file, so a whole archive can be scanned
+    with array operations without copying it into memory. A round left
+    incomplete at the end of the file, e.g. by an interrupted writer, is
+    ignored.
+
+    Attributes:
+        num_players (int): The number of players, the dealer included.
+        num_decks (int): The number of decks in the shoe.
+        max_cards (int): The number of card slots per hand.
+        rounds (:obj:`numpy.ndarray`): The archived rounds.
+
+    """
+
+    def __init__(self, path):
+        """Constructs an instance of RecordReader and maps the archive.
+
+        Args:
+            path (str): The path of the archive.
+
+        Raises:
+            ValueError: If the file is not a round archive.
+
+        """
+        with open(path, 'rb') as archive_file:
+            header = archive_file.read(HEADER_SIZE)
+            if len(header) != HEADER_SIZE or not header.startswith(_FILE_MAGIC):
+                raise ValueError("Not a round archive: " + path)
+            _, self.num_players, self.max_cards, self.num_decks = _HEADER.unpack_from(header)
+            self._mmap = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        dtype = record_dtype(self.num_players, self.max_cards)
+        count = (len(self._mmap) - HEADER_SIZE) // dtype.itemsize
+        self.rounds = np.frombuffer(self._mmap, dtype, count, HEADER_SIZE)
+
+    def __len__(self):
+        """Gets the number of archived rounds.
+
+        Returns:
+            int: The number of rounds.
+
+        """
+        return len(self.rounds)
+
+    def chunks(self, chunk_size=65536):
+        """Splits the archive into consecutive views.
+
+        Args:
+            chunk_size (int): The number of rounds per view (default to be 65536).
+
+        Yields:
+            :obj:`numpy.ndarray`: A view of each chunk of rounds.
+
+        """
+        for start in range(0, len(self.rounds), chunk_size):
+            yield self.rounds[start:start + chunk_size]
+
+    def __iter__(self):
+        """Iterates over the archived rounds as records, e.g. to replay them.
+
+        Yields:
+            :obj:`RoundRecord`: The record of each round.
+
+        """
+        for chunk in self.chunks():
+            for seed, hits, scores in zip(chunk['seed'].tolist(), chunk['hits'].tolist(), chunk['scores'].tolist()):
+                yield RoundRecord(seed, self.num_decks, hits, scores)
+
+    def close(self):
+        """Unmaps the archive.
+
+        Raises:
+            BufferError: If views of the rounds are still in use.
+
+        """
+        self.rounds = None
+        self._mmap.close()
+
+    def __enter__(self):
+        """Enters a context that closes the reader on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the reader."""
+        self.close()
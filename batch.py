@@ -0,0 +1,258 @@
+import math
+
+import numpy as np
+
+from card import CARDS
+from deck import HI_LO_TAGS
+from engine import Engine
+from policy import BatchPolicyPlayer, DecisionStates, RandomPolicy, as_batch_policy
+from rules import TIES_PUSH, TIES_TO_DEALER, resolve_rules
+from simulation import Statistics
+
+# The value of each card in CARDS, with 'A' counted as 1.
+CARD_VALUES = np.array([card.value for card in CARDS], dtype=np.int8)
+
+
+class BatchSimulator:
+    """A simulator that plays a batch of rounds at once with NumPy arrays.
+
+    Each round of a batch is played with a freshly shuffled shoe, as in
+    Game. The shoes are held as an integer array with one row per round
+    and are shuffled lazily: every draw picks a random card among the
+    cards left in the row (a partial Fisher-Yates shuffle), so only the
+    cards actually dealt are ever shuffled.
+
+    The rules are those of the object model, applied as masked array
+    operations over all rounds of the batch: the dealing order of
+    Dealer.deal_cards_for_initiation, and each seat hits until their
+    policy says stand or the hand busts. Hands are kept as the hand states
+    of Rules, and the scoring, the dealer's decisions and the ranking of
+    the hands are gathered from the tables of the rules.
+
+    The policy of a seat is a BatchPolicy, asked once per seat and draw
+    for every round still waiting for a decision, not once per card. By
+    default every seat follows RandomPolicy, the ComputerPlayer policy
+    (hit or stand with equal chance), with the simulator's generator.
+
+    Attributes:
+        num_computer_player (int): The number of computer players.
+        num_decks (int): The number of decks in each shoe.
+        rules (:obj:`Rules`): The rules of the rounds.
+        policies (:obj:`list` of :obj:`BatchPolicy`): The policy of each seat.
+        batch_size (int): The maximum number of rounds played at once.
+        player_names (:obj:`list` of :obj:`str`): The names of all players,
+            the dealer being the last one.
+
+    """
+
+    def __init__(self, num_computer_player=1, num_decks=None, seed=None, batch_size=100000, rules=None,
+                 policies=None):
+        """Constructs an instance of BatchSimulator.
+
+        Args:
+            num_computer_player (int): The number of computer players (default to be 1).
+            num_decks (int, optional): The number of decks in each shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            seed (int, optional): The seed of the random number generator.
+            batch_size (int): The maximum number of rounds played at once
+                (default to be 100000). Bounds the memory used by the shoes.
+            rules (:obj:`Rules`, optional): The rules of the rounds. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+            policies (list, optional): The policy of each seat, see
+                as_batch_policy. Every seat follows a RandomPolicy if not given.
+
+        Raises:
+            ValueError: If there is no computer player, if `num_decks` is
+                not the number of decks of `rules`, if the number of cards
+                required by the initial dealing exceeds the shoe, or if the
+                number of policies is not the number of seats.
+
+        """
+        rules = resolve_rules(num_decks, rules)
+        num_decks = rules.num_decks
+        if num_computer_player < 1:
+            raise ValueError("The table must have at least one player!")
+        if (num_computer_player + 1) * 2 > 52 * num_decks:
+            raise ValueError("Too many players and not enough card.")
+
+        self.num_computer_player = num_computer_player
+        self.num_decks = num_decks
+        self.rules = rules
+        self.batch_size = batch_size
+        self.player_names = ["Computer Player " + str(_) for _ in range(1, num_computer_player + 1)]
+        self.player_names.append("Dealer")
+        self._seed = seed
+        self._rng = np.random.default_rng(seed)
+        if policies is None:
+            policies = [RandomPolicy(self._rng) for _ in range(num_computer_player)]
+        if len(policies) != num_computer_player:
+            raise ValueError("Every seat must have exactly one policy!")
+        self.policies = [as_batch_policy(policy, rules) for policy in policies]
+        self._shoe = np.tile(CARD_VALUES, num_decks)
+
+        # The tables of the rules as arrays, the dealer's one indexed by
+        # hand state.
+        state_totals = np.array(rules.state_totals, dtype=np.int16)
+        self._next_state = np.array(rules.next_state, dtype=np.int16)
+        self._state_totals = state_totals
+        self._dealer_hits = np.array(rules.dealer_hits, dtype=bool)[np.array(rules.state_soft, dtype=np.intp), state_totals]
+        self._ranks = np.array(rules.ranks, dtype=np.int16)
+        self._state_soft = np.array(rules.state_soft, dtype=bool)
+        self._hi_lo = np.array(HI_LO_TAGS, dtype=np.int16)
+
+    def run(self, num_rounds):
+        """Simulates a number of rounds.
+
+        Args:
+            num_rounds (int): The number of rounds.
+
+        Returns:
+            :obj:`Statistics`: The statistics of all rounds.
+
+        Raises:
+            RuntimeError: If a round needs more cards than the shoe holds.
+
+        """
+        statistics = Statistics(self.player_names)
+        for start in range(0, num_rounds, self.batch_size):
+            self._play_batch(min(self.batch_size, num_rounds - start), statistics)
+        return statistics
+
+    def _play_batch(self, num_rounds, statistics):
+        """Plays a batch of rounds and adds their outcomes to the statistics.
+
+        Args:
+            num_rounds (int): The number of rounds in the batch.
+            statistics (:obj:`Statistics`): The statistics to update.
+
+        """
+        rng = self._rng
+        num_players = len(self.player_names)
+        shoe_size = len(self._shoe)
+        shoes = np.tile(self._shoe, num_rounds)
+        row_starts = np.arange(num_rounds, dtype=np.int64) * shoe_size
+        next_state = self._next_state
+        state_totals = self._state_totals
+        states = np.zeros((num_players, num_rounds), dtype=np.int16)
+        num_cards = np.zeros((num_players, num_rounds), dtype=np.int16)
+        running_counts = np.zeros(num_rounds, dtype=np.int16)
+        hi_lo = self._hi_lo
+        all_rounds = np.arange(num_rounds)
+
+        # Every round deals the same number of cards initially, so the
+        # initial deal works on whole rows without fancy indexing. The
+        # dealer's face-down card, dealt last, is not counted.
+        for position in range(num_players * 2):
+            seat = position % num_players
+            current = row_starts + position
+            picked = current + (rng.random(num_rounds) * (shoe_size - position)).astype(np.int64)
+            values = shoes[picked]
+            shoes[picked] = shoes[current]
+            states[seat] = next_state[states[seat] * 11 + values]
+            if position == num_players - 1:
+                upcards = values
+            if position < num_players * 2 - 1:
+                running_counts += hi_lo[values]
+        num_cards += 2
+        positions = np.full(num_rounds, num_players * 2, dtype=np.int64)
+
+        def deal(rounds, seat):
+            """Deals the next card of the given rounds' shoes to a seat."""
+            dealt = positions[rounds]
+            if dealt.max() >= shoe_size:
+                raise RuntimeError("We run out of cards.")
+            current = row_starts[rounds] + dealt
+            picked = current + (rng.random(rounds.size) * (shoe_size - dealt)).astype(np.int64)
+            values = shoes[picked]
+            shoes[picked] = shoes[current]
+            positions[rounds] = dealt + 1
+            states[seat, rounds] = next_state[states[seat, rounds] * 11 + values]
+            num_cards[seat, rounds] += 1
+            running_counts[rounds] += hi_lo[values]
+
+        state_soft = self._state_soft
+        for seat, policy in enumerate(self.policies):
+            seat_states = states[seat]
+            active = all_rounds
+            while active.size:
+                hand_states = seat_states[active]
+                decisions = policy.decide(DecisionStates(state_totals[hand_states], state_soft[hand_states],
+                                                         upcards[active], shoe_size - positions[active],
+                                                         running_counts[active]))
+                active = active[decisions == 1]
+                if not active.size:
+                    break
+                deal(active, seat)
+                active = active[state_totals[seat_states[active]] <= 21]
+
+        dealer = num_players - 1
+        dealer_states = states[dealer]
+        dealer_hits = self._dealer_hits
+        active = all_rounds
+        while True:
+            active = active[dealer_hits[dealer_states[active]]]
+            if not active.size:
+                break
+            deal(active, dealer)
+
+        totals = state_totals[states]
+        busts = totals > 21
+        ranks = self._ranks[((num_cards == 2) & (totals == 21)).astype(np.intp), totals]
+        best_ranks = ranks.max(axis=0)
+        is_winner = (ranks == best_ranks) & (best_ranks > 0)
+        num_winners = is_winner.sum(axis=0)
+        if self.rules.ties == TIES_TO_DEALER:
+            dealer_ties = is_winner[dealer] & (num_winners > 1)
+            is_winner[:dealer] &= ~dealer_ties
+            num_winners[dealer_ties] = 1
+        elif self.rules.ties == TIES_PUSH:
+            is_winner &= num_winners == 1
+            num_winners[num_winners > 1] = 0
+        sole_winner = is_winner & (num_winners == 1)
+        tied_winner = is_winner & (num_winners > 1)
+
+        statistics.rounds += num_rounds
+        statistics.no_winner_rounds += int((num_winners == 0).sum())
+        for counts, array in ((statistics.wins, sole_winner), (statistics.ties, tied_winner),
+                              (statistics.busts, busts), (statistics.score_totals, totals),
+                              (statistics.cards_drawn, num_cards)):
+            for index, count in enumerate(array.sum(axis=1, dtype=np.int64).tolist()):
+                counts[index] += count
+
+    def cross_check(self, num_rounds, tolerance=4.0):
+        """Compares the outcome distribution with that of the object model.
+
+        The same number of rounds is simulated by this simulator and by an
+        Engine that reshuffles before every round, whose players follow
+        the same policies one hand at a time. For every player and
+        every outcome (win, tie, bust), the difference between the two
+        rates is divided by its standard error.
+
+        Args:
+            num_rounds (int): The number of rounds simulated by each model.
+            tolerance (float): The largest absolute z-score accepted
+                (default to be 4).
+
+        Returns:
+            tuple: A bool, True if every z-score is within the tolerance,
+                and a list of (player name, outcome, batch rate, object
+                rate, z-score) tuples.
+
+        """
+        batch_statistics = self.run(num_rounds)
+        players = [BatchPolicyPlayer(number, policy) for number, policy in enumerate(self.policies, 1)]
+        engine = Engine(players=players, penetration=0.0, seed=self._seed, rules=self.rules)
+        object_statistics = Statistics(engine.player_names)
+        for result in engine.play_rounds(num_rounds):
+            object_statistics.add(result)
+
+        rows = []
+        for outcome in ('wins', 'ties', 'busts'):
+            for index, name in enumerate(self.player_names):
+                batch_rate = getattr(batch_statistics, outcome)[index] / batch_statistics.rounds
+                object_rate = getattr(object_statistics, outcome)[index] / object_statistics.rounds
+                pooled_rate = (batch_rate + object_rate) / 2
+                standard_error = math.sqrt(max(pooled_rate * (1 - pooled_rate), 1e-12) * 2 / num_rounds)
+                rows.append((name, outcome, batch_rate, object_rate, (batch_rate - object_rate) / standard_error))
+        return all(abs(row[4]) <= tolerance for row in rows), rows
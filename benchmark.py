@@ -0,0 +1,301 @@
+"""Benchmarks every phase of a round.
+
+Usage:
+    python benchmark.py [--output FILE] [--baseline FILE] [--threshold RATIO]
+    python benchmark.py [--output FILE] --quick
+
+The results are written as JSON. If a baseline file from an earlier run is
+given, every metric is compared with it and the run fails with exit code 1
+if any metric is worse by more than the threshold ratio. Quick runs are
+too short to time every metric steadily, so they cannot be compared with
+a baseline; they only check that every benchmark runs.
+
+The speed of a shared machine drifts for seconds at a time, by more than
+the threshold. Every benchmark is therefore run in several passes spread
+over the whole run, and the best value of each metric is kept, so that
+each metric gets a chance to be timed while the machine is fast. A
+slowdown that lasts the whole run cannot be told from a regression, so
+the baseline has to come from the same, otherwise idle machine.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from card import CARDS
+from deck import Deck
+from engine import Engine
+from player import ComputerPlayer
+
+# Metrics where a higher value is better. Lower is better for the others.
+HIGHER_IS_BETTER = ('rounds_per_sec',)
+
+# The default largest accepted relative slowdown.
+THRESHOLD = 0.2
+
+# The number of passes over every benchmark.
+PASSES = 5
+
+# The table sizes benchmarked, with the number of decks that lets every
+# seat be dealt.
+SEAT_COUNTS = ((1, 1), (7, 2), (100, 8))
+
+
+def _best_of(repeat, function):
+    """Runs a function several times and keeps the shortest duration.
+
+    Args:
+        repeat (int): The number of runs.
+        function (callable): The function to time.
+
+    Returns:
+        int: The shortest duration, in nanoseconds.
+
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        function()
+        duration = time.perf_counter_ns() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def _keep_best(best, metrics):
+    """Merges the metrics of a pass of a benchmark into the best ones so far.
+
+    Args:
+        best (dict): The best metrics so far, updated in place.
+        metrics (dict): The metrics of the pass.
+
+    """
+    for metric, value in metrics.items():
+        if metric not in best:
+            best[metric] = value
+        elif metric in HIGHER_IS_BETTER:
+            best[metric] = max(best[metric], value)
+        else:
+            best[metric] = min(best[metric], value)
+
+
+def bench_deal_card(num_cards, repeat):
+    """Measures Deck.deal_card and Deck.shuffle.
+
+    Returns:
+        dict: The nanoseconds per dealt card and per shuffle of an
+            8-deck shoe.
+
+    """
+    deck = Deck(8, 1.0)
+    rounds = num_cards // 400
+
+    def deal():
+        for _ in range(rounds):
+            # Rewind rather than reshuffle, so that only the dealing is timed.
+            deck.rewind()
+            for _ in range(400):
+                deck.deal_card()
+
+    def shuffle():
+        for _ in range(rounds):
+            deck.shuffle()
+
+    return {'ns_per_card': _best_of(repeat, deal) / (rounds * 400),
+            'ns_per_shuffle': _best_of(repeat, shuffle) / rounds}
+
+
+def bench_score_update(num_updates, repeat):
+    """Measures Player.update_score.
+
+    Returns:
+        dict: The nanoseconds per score update.
+
+    """
+    player = ComputerPlayer(1)
+    first, second, third, fourth = CARDS[0], CARDS[12], CARDS[1], CARDS[13]
+    hands_per_run = num_updates // 4
+
+    def update():
+        hand = player.hand
+        hands = player.hands
+        for _ in range(hands_per_run):
+            hand.reset()
+            hands.clear()
+            hands.append(first)
+            player.update_score()
+            hands.append(second)
+            player.update_score()
+            hands.append(third)
+            player.update_score()
+            hands.append(fourth)
+            player.update_score()
+
+    return {'ns_per_score_update': _best_of(repeat, update) / (hands_per_run * 4)}
+
+
+def bench_declare_result(num_seats, num_decks, num_calls, repeat):
+    """Measures Rules.find_winners, the winner rule of the engines, on a played round.
+
+    Returns:
+        dict: The nanoseconds per winner declaration.
+
+    """
+    engine = Engine(num_seats, num_decks=num_decks, seed=0)
+    engine.play_round()
+    players = engine.all_players
+    find_winners = engine.rules.find_winners
+
+    def declare():
+        for _ in range(num_calls):
+            find_winners(players)
+
+    return {'ns_per_declare_result': _best_of(repeat, declare) / num_calls}
+
+
+def bench_many_rounds(num_seats, num_decks, num_rounds, repeat):
+    """Measures rounds played one after another at the same table.
+
+    Returns:
+        dict: The rounds per second, the nanoseconds per dealt card and the
+            memory blocks kept per round.
+
+    """
+    engine = Engine(num_seats, num_decks=num_decks, seed=0)
+    cards = [0]
+
+    def play():
+        count = 0
+        for result in engine.play_rounds(num_rounds):
+            for hands in result.cards:
+                count += len(hands)
+        cards[0] = count
+
+    duration = _best_of(repeat, play)
+    blocks_before = sys.getallocatedblocks()
+    for _ in engine.play_rounds(num_rounds):
+        pass
+    blocks_after = sys.getallocatedblocks()
+    return {'rounds_per_sec': num_rounds * 1e9 / duration,
+            'ns_per_round_card': duration / cards[0],
+            'blocks_kept_per_round': max(blocks_after - blocks_before, 0) / num_rounds}
+
+
+def bench_single_round(num_seats, num_decks, num_rounds, repeat):
+    """Measures setting up a new table and playing a single round on it.
+
+    Returns:
+        dict: The rounds per second and the peak memory of one round.
+
+    """
+    def play():
+        for seed in range(num_rounds):
+            Engine(num_seats, num_decks=num_decks, seed=seed).play_round()
+
+    duration = _best_of(repeat, play)
+    tracemalloc.start()
+    Engine(num_seats, num_decks=num_decks, seed=0).play_round()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'rounds_per_sec': num_rounds * 1e9 / duration, 'peak_bytes_per_round': peak}
+
+
+def run(quick=False):
+    """Runs every benchmark, in several passes.
+
+    Args:
+        quick (bool): True to run fewer iterations, False otherwise.
+
+    Returns:
+        dict: The best metrics of each benchmark, keyed by benchmark name.
+
+    """
+    scale = 10 if quick else 1
+    repeat = 3
+    benchmarks = [('deal_card', bench_deal_card, (400000 // scale, repeat)),
+                  ('score_update', bench_score_update, (400000 // scale, repeat))]
+    for num_seats, num_decks in SEAT_COUNTS:
+        rounds = max(20000 // num_seats // scale, 10)
+        benchmarks += [
+            ('declare_result_{}_seats'.format(num_seats), bench_declare_result,
+             (num_seats, num_decks, rounds * 10, repeat)),
+            ('many_rounds_{}_seats'.format(num_seats), bench_many_rounds, (num_seats, num_decks, rounds, repeat)),
+            ('single_round_{}_seats'.format(num_seats), bench_single_round,
+             (num_seats, num_decks, max(rounds // 10, 5), repeat)),
+        ]
+    results = {name: {} for name, _, _ in benchmarks}
+    for _ in range(PASSES):
+        for name, benchmark, args in benchmarks:
+            _keep_best(results[name], benchmark(*args))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compares results with a baseline.
+
+    Args:
+        results (dict): The metrics of this run.
+        baseline (dict): The metrics of an earlier run.
+        threshold (float): The largest accepted relative slowdown.
+
+    Returns:
+        :obj:`list` of :obj:`str`: A description of every regression.
+
+    """
+    regressions = []
+    for name, metrics in results.items():
+        old_metrics = baseline.get(name, {})
+        for metric, value in metrics.items():
+            old_value = old_metrics.get(metric)
+            if not old_value or metric.startswith(('blocks_', 'peak_')):
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = old_value / value - 1 if value else float('inf')
+            else:
+                change = value / old_value - 1
+            if change > threshold:
+                regressions.append("{}.{}: {:.4g} -> {:.4g} ({:+.1%} worse)".format(
+                    name, metric, old_value, value, change))
+    return regressions
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line.
+
+    Returns:
+        int: The exit code, 1 if a regression is found, 0 otherwise.
+
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks every phase of a round.")
+    parser.add_argument('--output', default='benchmark_results.json', help="The JSON file to write.")
+    parser.add_argument('--baseline', help="A JSON file of an earlier run to compare with.")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="The largest accepted relative slowdown (default to be {}).".format(THRESHOLD))
+    parser.add_argument('--quick', action='store_true',
+                        help="Run fewer iterations, to check that every benchmark runs. Cannot be compared "
+                             "with a baseline.")
+    args = parser.parse_args(argv)
+    if args.quick and args.baseline:
+        parser.error("a quick run is too noisy to be compared with a baseline")
+
+    results = run(args.quick)
+    with open(args.output, 'w') as output_file:
+        json.dump({'python': platform.python_version(), 'results': results}, output_file, indent=2)
+    for name, metrics in results.items():
+        print(name + ": " + ", ".join("{} {:.4g}".format(metric, value) for metric, value in metrics.items()))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,26 @@
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+SUITS = ('Spades', 'Diamonds', 'Clubs', 'Hearts')
+
+# The score of each rank, with 'A' counted as 1. Computed once at import so
+# that scoring never parses a rank string.
+RANK_VALUES = {rank: (1 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank)) for rank in RANKS}
+
+
 class Card:
     """A single card in a deck.
 
+    Instances of Card are small and immutable in practice. The 52 distinct
+    cards are created once at import (see CARDS) and shared by every deck.
+
     Attributes:
             rank (str): The rank of the card, eg. 'J', 'Q', '2'.
             suit (str): The suit of the card, eg. 'Spades', 'Clubs', 'Diamonds'.
+            code (int): The index of the card in CARDS, from 0 to 51.
+            value (int): The score of the rank, with 'A' counted as 1.
+            is_ace (bool): True if the rank is 'A', False otherwise.
 
     """
+    __slots__ = ('rank', 'suit', 'code', 'value', 'is_ace')
 
     def __init__(self, rank, suit):
         """Constructs an instance of Card.
@@ -17,6 +32,9 @@ class Card:
         """
         self.rank = rank
         self.suit = suit
+        self.code = SUITS.index(suit) * len(RANKS) + RANKS.index(rank)
+        self.value = RANK_VALUES[rank]
+        self.is_ace = rank == 'A'
 
     def __str__(self):
         """Represents an instance of Card as string.
@@ -51,8 +69,10 @@ class Card:
         try:
             if rank == 'A':
                 raise ValueError("This function does not evaluate rank of A")
-            if rank in ('J', 'Q', 'K'):
-                return 10
-            return int(rank)
+            return RANK_VALUES[rank]
         except ValueError as ace_error:
-            print(ace_error)
\ No newline at end of file
+            print(ace_error)
+
+
+# The 52 distinct cards, indexed by Card.code.
+CARDS = tuple(Card(rank, suit) for suit in SUITS for rank in RANKS)
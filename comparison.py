@@ -0,0 +1,271 @@
+import math
+import random
+import statistics
+
+from engine import Engine
+from player import ComputerPlayer
+from rules import resolve_rules
+
+
+class RunningStat:
+    """The streaming mean and variance of a series of values.
+
+    The values are not kept. The mean and the sum of squared deviations
+    are updated with Welford's method, which stays accurate over any
+    number of values, and two instances can be merged.
+
+    Attributes:
+        count (int): The number of values.
+        mean (float): The mean of the values.
+
+    """
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        """Constructs an instance of RunningStat with no value."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        """Adds a value.
+
+        Args:
+            value (float): The value.
+
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """Adds the values of another instance of RunningStat to this one.
+
+        Args:
+            other (:obj:`RunningStat`): The values to add.
+
+        """
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+
+    @property
+    def variance(self):
+        """float: The sample variance of the values, 0 with fewer than 2 values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def half_width(self, z_score):
+        """Gets the half width of the confidence interval of the mean.
+
+        Args:
+            z_score (float): The standard normal quantile of the confidence level.
+
+        Returns:
+            float: The half width, infinite with fewer than 2 values.
+
+        """
+        if self.count < 2:
+            return math.inf
+        return z_score * math.sqrt(self.variance / self.count)
+
+
+class ComparisonResult:
+    """The outcome of a policy comparison.
+
+    A round is worth 1 point to a policy if it wins alone, 0.5 if it ties
+    for the highest score and 0 if it loses.
+
+    Attributes:
+        policy_names (:obj:`list` of :obj:`str`): The names of the policies,
+            the first one being the baseline.
+        rounds (int): The number of rounds played by each policy.
+        z_score (float): The standard normal quantile of the confidence level.
+        points (:obj:`list` of :obj:`RunningStat`): The points of each policy.
+        wins (:obj:`list` of :obj:`RunningStat`): The sole wins of each policy.
+        ties (:obj:`list` of :obj:`RunningStat`): The ties of each policy.
+        losses (:obj:`list` of :obj:`RunningStat`): The losses of each policy.
+        differences (:obj:`list` of :obj:`RunningStat`): The points of each
+            policy minus those of the baseline in the same round, None for
+            the baseline.
+
+    """
+
+    def __init__(self, policy_names, z_score):
+        """Constructs an empty instance of ComparisonResult.
+
+        Args:
+            policy_names (:obj:`list` of :obj:`str`): The names of the policies.
+            z_score (float): The standard normal quantile of the confidence level.
+
+        """
+        self.policy_names = list(policy_names)
+        self.rounds = 0
+        self.z_score = z_score
+        self.points = [RunningStat() for _ in policy_names]
+        self.wins = [RunningStat() for _ in policy_names]
+        self.ties = [RunningStat() for _ in policy_names]
+        self.losses = [RunningStat() for _ in policy_names]
+        self.differences = [None] + [RunningStat() for _ in policy_names[1:]]
+
+    def widest_interval(self):
+        """Gets the width of the widest confidence interval of a difference.
+
+        Returns:
+            float: The largest width, infinite before two rounds.
+
+        """
+        return max(2 * difference.half_width(self.z_score) for difference in self.differences[1:])
+
+    def __str__(self):
+        """Represents the comparison as string.
+
+        Returns:
+            str: One line per policy with their rates, and their difference
+                with the baseline and its confidence interval.
+
+        """
+        lines = ["Rounds: {}".format(self.rounds)]
+        for index, name in enumerate(self.policy_names):
+            line = "{}: win {:.4f}, tie {:.4f}, loss {:.4f}, points {:.4f}".format(
+                name, self.wins[index].mean, self.ties[index].mean, self.losses[index].mean, self.points[index].mean)
+            difference = self.differences[index]
+            if difference is not None:
+                line += ", vs {} {:+.4f} +/- {:.4f}".format(self.policy_names[0], difference.mean,
+                                                            difference.half_width(self.z_score))
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+class PolicyComparison:
+    """A Monte Carlo comparison of computer player policies with common random numbers.
+
+    Each policy sits in the first seat of its own table, against the same
+    opponents. Every round, all tables are dealt from the same seed, see
+    Engine.play_round, and all players decide with generators seeded
+    alike, so the policies face identical shoes. The differences between
+    policies in a round are then due to the policies alone, and their
+    variance is far smaller than between independent rounds. The rounds
+    stop as soon as the confidence interval of every difference with the
+    baseline, i.e. the first policy, is narrower than the target width.
+
+    Attributes:
+        policies (dict): A function creating a player, keyed by policy
+            name. The function takes the player number and a random number
+            generator, as ComputerPlayer does.
+        num_opponents (int): The number of random computer players seated
+            after the policy.
+        num_decks (int): The number of decks in each shoe.
+        seed (int): The master seed.
+        rules (:obj:`Rules`): The rules of every table.
+
+    """
+
+    def __init__(self, policies, num_opponents=1, num_decks=None, seed=0, rules=None):
+        """Constructs an instance of PolicyComparison.
+
+        Args:
+            policies (dict): A function creating a player, keyed by policy
+                name. The first policy is the baseline.
+            num_opponents (int): The number of random computer players
+                seated after the policy (default to be 1).
+            num_decks (int, optional): The number of decks in each shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            seed (int): The master seed (default to be 0).
+            rules (:obj:`Rules`, optional): The rules of every table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If fewer than two policies are given, or if
+                `num_decks` is not the number of decks of `rules`.
+
+        """
+        if len(policies) < 2:
+            raise ValueError("At least two policies are needed for a comparison!")
+        self.policies = dict(policies)
+        self.num_opponents = num_opponents
+        self.rules = resolve_rules(num_decks, rules)
+        self.num_decks = self.rules.num_decks
+        self.seed = seed
+
+    def _tables(self):
+        """Creates the table of each policy.
+
+        Returns:
+            :obj:`list` of tuple: The table of each policy, in the order of
+                the policies, the random number generator of the policy and
+                that of the opponents. Keeping them apart means the
+                opponents decide alike whatever the policy draws.
+
+        """
+        tables = []
+        for factory in self.policies.values():
+            policy_rng = random.Random()
+            opponent_rng = random.Random()
+            players = [factory(1, policy_rng)]
+            players.extend(ComputerPlayer(_, opponent_rng) for _ in range(2, self.num_opponents + 2))
+            engine = Engine(players=players, penetration=0.0, rules=self.rules)
+            tables.append((engine, policy_rng, opponent_rng))
+        return tables
+
+    def run(self, target_width=0.01, confidence=0.95, max_rounds=1000000, min_rounds=1000, check_every=1000,
+            common_random_numbers=True):
+        """Plays rounds until every difference with the baseline is known precisely enough.
+
+        Args:
+            target_width (float): The width below which the confidence
+                interval of a difference of points is narrow enough
+                (default to be 0.01).
+            confidence (float): The confidence level of the intervals
+                (default to be 0.95).
+            max_rounds (int): The largest number of rounds played (default
+                to be 1000000).
+            min_rounds (int): The smallest number of rounds played (default
+                to be 1000).
+            check_every (int): The number of rounds between two checks of
+                the intervals (default to be 1000).
+            common_random_numbers (bool): True to deal the same shoes to
+                every policy, False to deal independent shoes, e.g. to
+                measure what common random numbers save (default to be True).
+
+        Returns:
+            :obj:`ComparisonResult`: The outcome of the comparison.
+
+        """
+        tables = self._tables()
+        result = ComparisonResult(list(self.policies), statistics.NormalDist().inv_cdf((1 + confidence) / 2))
+        seeds = random.Random(self.seed)
+        round_points = [0.0] * len(tables)
+        while result.rounds < max_rounds:
+            deal_seed = seeds.getrandbits(64)
+            decision_seed = seeds.getrandbits(64)
+            for index, (engine, policy_rng, opponent_rng) in enumerate(tables):
+                if not common_random_numbers and index > 0:
+                    deal_seed = seeds.getrandbits(64)
+                    decision_seed = seeds.getrandbits(64)
+                policy_rng.seed(decision_seed)
+                opponent_rng.seed(decision_seed + 1)
+                winners = engine.play_round(deal_seed).winners
+                win = tie = 0
+                if engine.player_names[0] in winners:
+                    if len(winners) == 1:
+                        win = 1
+                    else:
+                        tie = 1
+                result.wins[index].add(win)
+                result.ties[index].add(tie)
+                result.losses[index].add(1 - win - tie)
+                round_points[index] = win + tie / 2
+                result.points[index].add(round_points[index])
+            for index in range(1, len(tables)):
+                result.differences[index].add(round_points[index] - round_points[0])
+            result.rounds += 1
+            if (result.rounds >= min_rounds and result.rounds % check_every == 0
+                    and result.widest_interval() < target_width):
+                break
+        return result
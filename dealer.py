@@ -1,7 +1,6 @@
-import sys
-
 from deck import Deck
 from player import Player
+from rules import resolve_rules
 
 
 class Dealer(Player):
@@ -10,25 +9,46 @@ class Dealer(Player):
     Attributes:
         player_name (str): The name of the dealer, i.e. 'Dealer'.
         hands (:obj:`list` of :obj:`Card`): The dealer's hands of cards.
+        hand (:obj:`HandState`): The value of the dealer's hands.
         deck (:obj:`Deck`): The deck of the game. The dealer manages the deck.
         is_bust (bool): True if the dealer busts, False otherwise.
         score (int): The dealer's score.
         is_dealer_turn_started (bool): True if the dealer's turn has started, False otherwise.
+        rules (:obj:`Rules`): The rules of the table.
 
     """
 
-    def __init__(self):
+    def __init__(self, num_decks=None, penetration=0.0, rng=None, rules=None):
         """Constructs an instance of Dealer.
 
         The dealer shuffles the deck at the beginning of the game.
 
+        Args:
+            num_decks (int, optional): The number of decks in the shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0, i.e. reshuffle every round).
+            rng (:obj:`random.Random`, optional): The random number generator
+                used to shuffle the deck.
+            rules (:obj:`Rules`, optional): The rules of the table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If `num_decks` is not the number of decks of `rules`.
+
         """
         self.player_name = "Dealer"
         self.hands = []
-        self.deck = Deck()
+        self.rules = resolve_rules(num_decks, rules)
+        self._dealer_hits = self.rules.dealer_hits
+        self.deck = Deck(self.rules.num_decks, penetration, rng)
         self.deck.shuffle()
-        self.is_bust = False
-        self.score = 0
+        self.reset()
+
+    def reset(self):
+        """Clears the dealer's hands, score and status for a new round."""
+        super().reset()
         self.is_dealer_turn_started = False
 
     def deal_cards_for_initiation(self, game):
@@ -37,37 +57,32 @@ class Dealer(Player):
         The dealer gives 1 card face-up to all players and 1 card face-up
         to themself. The dealer then gives 1 card face-up to all players,
         and 1 card face-down to themself. The hands of cards and initial
-        score are updated for each player. The game automatically ends if
-        the number of cards required by the players exceeds the number of
-        cards in the deck.
+        score are updated for each player.
 
         Args:
             game (:obj:`Game`): The instance of Game. Used to update each
-                player's hands and score.
+                player's hands and score, and to get the seed of the round.
 
         Raises:
             ValueError: If the number of cards required by the players
-                exceeds the number of cards in the deck, the game ends.
+                exceeds the number of cards in the deck. Nothing is dealt.
 
         """
-        try:
-            total_player_num = len(game.all_players)
-            cards_to_deal = total_player_num * 2
+        total_player_num = len(game.all_players)
+        cards_to_deal = total_player_num * 2
+        self.deck.begin_round(cards_to_deal, game.round_seed)
 
-            if cards_to_deal > len(self.deck):
-                raise ValueError("Too many players and not enough card. The game ends.")
+        if cards_to_deal > len(self.deck):
+            raise ValueError("Too many players and not enough card. The game ends.")
 
-            for player in game.all_players:
-                player.hands.append(self.deck.deal_card())
-            for player in game.all_players:
-                player.hands.append(self.deck.deal_card())
-                player.initiate_score()
+        for player in game.all_players:
+            player.hands.append(self.deck.deal_card())
+        for player in game.all_players:
+            player.hands.append(self.deck.deal_card())
+            player.initiate_score()
 
-            self.initiate_score()
-
-        except ValueError as too_many_players_error:
-            print(too_many_players_error)
-            sys.exit(1)
+        self.initiate_score()
+        game.sink.deal(game.all_players)
 
     def deal_cards_for_hit(self, game, player_index):
         """Deals card whenever a player hits.
@@ -79,29 +94,47 @@ class Dealer(Player):
                 all_players list.
 
         Raises:
-            RuntimeError: If the cards run out, the game ends.
+            RuntimeError: If the cards run out. This only happens if the
+                players hold every card of the shoe.
 
         """
-        try:
-            if len(self.deck) == 0:
-                raise RuntimeError("We run out of cards. The game ends.")
+        player = game.all_players[player_index]
+        game.sink.hit(player, self.hit(player))
 
-            card_to_deal = self.deck.deal_card()
-            game.all_players[player_index].hands.append(card_to_deal)
-            game.all_players[player_index].update_score()
+    def hit(self, player):
+        """Deals one card to a player and updates their score, without any output.
 
-            print(game.all_players[player_index].player_name + " got a new card: " + str(card_to_deal))
-            print(game.all_players[player_index].player_name + "'s current score: " + str(game.all_players[player_index].score))
+        Args:
+            player (:obj:`Player`): The player who hits.
 
-        except RuntimeError as no_card_error:
-            print(no_card_error)
-            sys.exit(1)
+        Returns:
+            :obj:`Card`: The card dealt to the player.
+
+        """
+        card_to_deal = self.deck.deal_card()
+        player.hands.append(card_to_deal)
+        player.update_score()
+        return card_to_deal
+
+    def must_hit(self):
+        """Checks whether the dealer has to keep hitting.
+
+        The answer is looked up in the dealer table of the rules, e.g.
+        True below 17, and on a soft 17 if the dealer hits it.
+
+        Returns:
+            bool: True if the dealer hits, False otherwise.
+
+        """
+        hand = self.hand
+        return self._dealer_hits[hand.is_soft][hand.total]
 
     def get_decision(self, game):
         """Gets the decision of dealer and takes corresponding actions in the dealer's turn.
 
         If the dealer's initial hands has a score < 17, then the dealer
-        needs to continuously hit until their score >= 17. If the dealer's
+        needs to continuously hit until their score >= 17, or past a soft
+        17 if the rules say so, see must_hit. If the dealer's
         score ever > 21, the dealer busts.
 
         Args:
@@ -109,10 +142,8 @@ class Dealer(Player):
                 attributes of dealer in the game.
 
         """
-        while self.score < 17:
-            print("Dealer needs to hit (current score < 17)")
+        while self.must_hit():
             self.deal_cards_for_hit(game, -1)
 
-        if self.score > 21:
-            self.is_bust = True
-            print(self.player_name + " BUST!")
\ No newline at end of file
+        if self.hand.is_bust:
+            game.sink.bust(self)
\ No newline at end of file
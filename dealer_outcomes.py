@@ -0,0 +1,213 @@
+from functools import lru_cache
+
+from rules import DEFAULT_RULES, STATE_SOFT, STATE_TOTALS, Rules
+
+# The final totals a dealer can stand on. The outcome distributions below
+# hold one probability per total, followed by the probability of a bust.
+DEALER_TOTALS = (17, 18, 19, 20, 21)
+BUST = len(DEALER_TOTALS)
+
+# The number of cards of each value (1 to 10, 'A' counted as 1) in a
+# 52-card deck. A composition is a tuple of 10 such counts.
+FULL_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+
+# The probability of drawing each value from an infinite deck.
+INFINITE_DECK_PROBABILITIES = tuple(count / 52 for count in FULL_DECK)
+
+# The outcome distributions that put all weight on a single outcome.
+_POINT_MASSES = tuple(tuple(1.0 if index == outcome else 0.0 for index in range(BUST + 1))
+                      for outcome in range(BUST + 1))
+
+# The maximum number of dealer states kept for shoe compositions.
+CACHE_SIZE = 200000
+
+# The dealer table of the rules, indexed by whether the dealer hits a
+# soft 17. It is the only option the dealer's outcomes depend on.
+_DEALER_HITS = (Rules(dealer_hits_soft_17=False).dealer_hits, Rules(dealer_hits_soft_17=True).dealer_hits)
+
+
+def composition_of(cards, num_decks=1):
+    """Counts the cards of each value left in a shoe, from the cards dealt.
+
+    A Deck keeps these counts up to date, see shoe_composition.
+
+    Args:
+        cards (:obj:`list` of :obj:`Card`): The cards already dealt from the shoe.
+        num_decks (int): The number of decks in the shoe (default to be 1).
+
+    Returns:
+        tuple: The number of cards of each value (1 to 10) left in the shoe.
+
+    """
+    counts = [count * num_decks for count in FULL_DECK]
+    for card in cards:
+        counts[card.value - 1] -= 1
+    return tuple(counts)
+
+
+def shoe_composition(deck, unseen_cards=()):
+    """Gets the composition of a shoe from its running counts, without a scan.
+
+    Args:
+        deck (:obj:`Deck`): The shoe.
+        unseen_cards (:obj:`list` of :obj:`Card`): Dealt cards nobody has
+            seen yet, e.g. the dealer's face-down card. They are counted as
+            still in the shoe.
+
+    Returns:
+        tuple: The number of cards of each value (1 to 10) left in the shoe.
+
+    """
+    counts = list(deck.remaining_counts())
+    for card in unseen_cards:
+        counts[card.value - 1] += 1
+    return tuple(counts)
+
+
+def _terminal(hard_total, has_ace, hits_soft_17):
+    """Gets the outcome of a hand the dealer stands on, if any.
+
+    Args:
+        hard_total (int): The sum of the card values, 'A' counted as 1.
+        has_ace (bool): True if the hand holds an 'A', False otherwise.
+        hits_soft_17 (bool): True if the dealer hits a soft 17.
+
+    Returns:
+        tuple: The outcome distribution of the hand, or None if the dealer
+            must hit.
+
+    """
+    if hard_total > 21:
+        return _POINT_MASSES[BUST]
+    state = hard_total * 2 + has_ace
+    total = STATE_TOTALS[state]
+    if _DEALER_HITS[hits_soft_17][STATE_SOFT[state]][total]:
+        return None
+    return _POINT_MASSES[total - DEALER_TOTALS[0]]
+
+
+@lru_cache(maxsize=None)
+def _infinite_deck(hard_total, has_ace, hits_soft_17):
+    """Gets the outcome distribution of a dealer hand drawn from an infinite deck.
+
+    Args:
+        hard_total (int): The sum of the card values, 'A' counted as 1.
+        has_ace (bool): True if the hand holds an 'A', False otherwise.
+        hits_soft_17 (bool): True if the dealer hits a soft 17.
+
+    Returns:
+        tuple: The probability of each final total and of a bust.
+
+    """
+    terminal = _terminal(hard_total, has_ace, hits_soft_17)
+    if terminal is not None:
+        return terminal
+    distribution = [0.0] * (BUST + 1)
+    for value in range(1, 11):
+        probability = INFINITE_DECK_PROBABILITIES[value - 1]
+        outcome = _infinite_deck(hard_total + value, has_ace or value == 1, hits_soft_17)
+        for index in range(BUST + 1):
+            distribution[index] += probability * outcome[index]
+    return tuple(distribution)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _finite_shoe(hard_total, has_ace, composition, hits_soft_17):
+    """Gets the outcome distribution of a dealer hand drawn from a finite shoe.
+
+    Args:
+        hard_total (int): The sum of the card values, 'A' counted as 1.
+        has_ace (bool): True if the hand holds an 'A', False otherwise.
+        composition (tuple): The number of cards of each value left in the shoe.
+        hits_soft_17 (bool): True if the dealer hits a soft 17.
+
+    Returns:
+        tuple: The probability of each final total and of a bust.
+
+    """
+    terminal = _terminal(hard_total, has_ace, hits_soft_17)
+    if terminal is not None:
+        return terminal
+    num_cards = sum(composition)
+    if num_cards == 0:
+        # The discarded cards would be shuffled back in: fall back to an
+        # infinite deck.
+        return _infinite_deck(hard_total, has_ace, hits_soft_17)
+    distribution = [0.0] * (BUST + 1)
+    for value in range(1, 11):
+        count = composition[value - 1]
+        if not count:
+            continue
+        remaining = composition[:value - 1] + (count - 1,) + composition[value:]
+        outcome = _finite_shoe(hard_total + value, has_ace or value == 1, remaining, hits_soft_17)
+        probability = count / num_cards
+        for index in range(BUST + 1):
+            distribution[index] += probability * outcome[index]
+    return tuple(distribution)
+
+
+def dealer_outcomes(upcard_value, composition=None, rules=None):
+    """Gets the exact distribution of the dealer's final total for an upcard.
+
+    The dealer draws the face-down card and then hits as long as the
+    dealer table of the rules says so, as in Dealer.get_decision, i.e.
+    below 17 and on a soft 17 if the dealer hits it. Results are memoized;
+    the states of finite shoes are kept in a bounded LRU cache.
+
+    Args:
+        upcard_value (int): The value of the dealer's face-up card, from 1
+            ('A') to 10, i.e. Card.value.
+        composition (tuple, optional): The number of cards of each value
+            left in the shoe, excluding the upcard. An infinite deck is
+            assumed if not given.
+        rules (:obj:`Rules`, optional): The rules of the table. Only whether
+            the dealer hits a soft 17 matters. The rules of the original
+            game are followed if not given.
+
+    Returns:
+        tuple: The probabilities of the final totals 17, 18, 19, 20, 21 and
+            of a bust, in this order.
+
+    Raises:
+        ValueError: If `upcard_value` is not between 1 and 10.
+
+    """
+    if not 1 <= upcard_value <= 10:
+        raise ValueError("The upcard value must be between 1 and 10!")
+    hits_soft_17 = bool((DEFAULT_RULES if rules is None else rules).dealer_hits_soft_17)
+    if composition is None:
+        return _infinite_deck(upcard_value, upcard_value == 1, hits_soft_17)
+    return _finite_shoe(upcard_value, upcard_value == 1, tuple(composition), hits_soft_17)
+
+
+def dealer_outcome_table(composition=None, rules=None):
+    """Gets the dealer outcome distribution for every upcard.
+
+    Args:
+        composition (tuple, optional): The number of cards of each value
+            left in the shoe. For each upcard, one card of its value is
+            removed from the shoe first. An infinite deck is assumed if not
+            given.
+        rules (:obj:`Rules`, optional): The rules of the table, see
+            dealer_outcomes.
+
+    Returns:
+        dict: The outcome distribution (see dealer_outcomes) keyed by the
+            upcard value, from 1 to 10. Upcards with no card left in the
+            shoe are left out.
+
+    """
+    table = {}
+    for value in range(1, 11):
+        if composition is None:
+            table[value] = dealer_outcomes(value, rules=rules)
+            continue
+        count = composition[value - 1]
+        if count:
+            table[value] = dealer_outcomes(value, composition[:value - 1] + (count - 1,) + composition[value:], rules)
+    return table
+
+
+def clear_cache():
+    """Empties the cache of finite-shoe dealer states."""
+    _finite_shoe.cache_clear()
@@ -1,49 +1,309 @@
-from card import Card
+from card import CARDS
+import itertools
 import random
 
+# A source of unique identifiers of deck orders, see Deck.save_state.
+_ORDER_IDS = itertools.count()
+
+# The number of cards of each value (1 to 10, 'A' counted as 1) in a
+# 52-card deck.
+VALUE_COUNTS = (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+
+# The Hi-Lo tag of each card value, indexed by Card.value (index 0 is
+# unused): +1 for 2 to 6, 0 for 7 to 9, -1 for 10-valued cards and 'A'.
+HI_LO_TAGS = (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1)
+
 
 class Deck:
-    """A 52-card deck.
+    """A shoe of one or more 52-card decks.
 
     A deck has four suits: Spades, Diamonds, Clubs, Hearts. Each suit
     contains 13 ranks: Ace, 2 to 10, J, Q, K.
 
+    Cards are dealt by advancing a cursor through the shuffled shoe, so
+    dealing a card costs O(1). A cut card is placed after the given
+    fraction of the shoe; once it is reached, the shoe is reshuffled
+    before the next round starts. Reshuffling permutes the existing
+    cards in place and never creates new instances of Card. Every deck in
+    the shoe shares the 52 preallocated cards of card.CARDS.
+
+    A round can also be dealt from a shoe shuffled from the round's own
+    seed. Such a round depends on nothing but the seed, so it can be
+    replayed exactly.
+
+    The deck keeps the number of cards of each value left to deal,
+    updated in O(1) per card, so the composition of the shoe and the
+    Hi-Lo running count can be queried without a scan.
+
+    The state of a deck can be saved and restored cheaply. The order of
+    the cards only changes when cards are shuffled, so every saved state
+    taken between two shuffles shares the same copy of the order.
+
     Attributes:
+        num_decks (int): The number of 52-card decks in the shoe.
+        _value_counts (:obj:`list` of int): The number of cards of each
+            value left to deal, indexed by Card.value (index 0 is unused).
         _cards (:obj:`list` of :obj:`Card`): A list of instances of Card.
+        _position (int): The index of the next card to deal.
+        _round_start (int): The index of the first card dealt in the
+            current round. Cards before it have been discarded.
+        _cut_card (int): The index of the cut card.
+        _rng (:obj:`random.Random`): The random number generator used to shuffle.
+        _order_id (int): The identifier of the current order of the cards,
+            changed whenever they are shuffled.
+        _saved_order (tuple): A copy of the order of the cards, shared by
+            the saved states.
+        _saved_order_id (int): The identifier of the order in _saved_order.
 
     """
 
-    def __init__(self):
-        """Constructs an instance of Deck."""
-        ranks = [str(n) for n in range(2, 11)]
-        ranks += ["J", "Q", "K", "A"]
-        suits = ["Spades", "Diamonds", "Clubs", "Hearts"]
+    def __init__(self, num_decks=1, penetration=0.0, rng=None):
+        """Constructs an instance of Deck.
 
-        self._cards = []
-        for suit in suits:
-            for rank in ranks:
-                self._cards.append(Card(rank, suit))
+        Args:
+            num_decks (int): The number of 52-card decks in the shoe
+                (default to be 1).
+            penetration (float): The fraction of the shoe dealt before the
+                cut card is reached, between 0 and 1 (default to be 0,
+                i.e. the shoe is reshuffled before every round).
+            rng (:obj:`random.Random`, optional): The random number generator
+                used to shuffle. The global `random` module is used if not given.
 
-        random.shuffle(self._cards)
+        Raises:
+            ValueError: If `num_decks` < 1 or `penetration` is not between
+                0 and 1.
+
+        """
+        if num_decks < 1:
+            raise ValueError("The shoe must have at least one deck!")
+        if not 0 <= penetration <= 1:
+            raise ValueError("The penetration must be between 0 and 1!")
+
+        self.num_decks = num_decks
+        self._cards = list(CARDS) * num_decks
+        self._rng = random if rng is None else rng
+        self._cut_card = int(len(self._cards) * penetration)
+        self._saved_order = None
+        self._saved_order_id = None
+        self._value_counts = [0] * (len(VALUE_COUNTS) + 1)
+        self.shuffle()
 
     def deal_card(self):
         """Deals one card from the deck.
 
+        If the deck runs out in the middle of a round, the cards discarded
+        in earlier rounds are shuffled back in first.
+
         Returns:
             :obj:`Card`: The card to be dealt.
 
+        Raises:
+            RuntimeError: If the deck runs out and there is no discarded
+                card to shuffle back in.
+
+        """
+        if self._position == len(self._cards):
+            self._shuffle_discards()
+        card = self._cards[self._position]
+        self._position += 1
+        self._value_counts[card.value] -= 1
+        return card
+
+    def begin_round(self, cards_needed=0, seed=None):
+        """Prepares the deck for a new round.
+
+        The whole shoe is reshuffled if the cut card has been reached or
+        fewer than `cards_needed` cards remain. All cards dealt so far
+        are considered discarded from now on.
+
+        Args:
+            cards_needed (int): The number of cards the round needs at least.
+            seed (int, optional): The seed of the round. If given, the
+                cards are put back in their original order and the whole
+                shoe is shuffled by a generator seeded with it, whatever
+                the cut card, so the round's cards only depend on the seed.
+
         """
-        return self._cards.pop(0)
+        if seed is not None:
+            self._cards[:] = CARDS * self.num_decks
+            random.Random(seed).shuffle(self._cards)
+            self._order_id = next(_ORDER_IDS)
+            self.rewind()
+        elif self._position >= self._cut_card or len(self) < cards_needed:
+            self.shuffle()
+        self._round_start = self._position
 
     def shuffle(self):
-        """Shuffles the deck."""
-        random.shuffle(self._cards)
+        """Shuffles the whole deck, including every card dealt so far."""
+        self._rng.shuffle(self._cards)
+        self._order_id = next(_ORDER_IDS)
+        self.rewind()
+
+    def rewind(self):
+        """Puts every card dealt so far back, without shuffling.
+
+        The cards are dealt again in the same order, from the first one.
+
+        """
+        self._position = 0
+        self._round_start = 0
+        self._reset_counts()
+
+    def _reset_counts(self, missing_cards=()):
+        """Resets the card counts after a shuffle.
+
+        Args:
+            missing_cards (:obj:`list` of :obj:`Card`): The cards that are
+                not in the shuffled shoe, e.g. those in play.
+
+        """
+        counts = self._value_counts
+        for value, count in enumerate(VALUE_COUNTS, 1):
+            counts[value] = count * self.num_decks
+        for card in missing_cards:
+            counts[card.value] -= 1
+
+    def shuffle_undealt(self, rng=None, unseen_card=None):
+        """Shuffles the cards not dealt yet, leaving the dealt ones in place.
+
+        A dealt card that nobody has seen yet, e.g. the dealer's face-down
+        card, can be shuffled together with them. It is then exchanged for
+        one of the undealt cards, picked at random: the replacement takes
+        the dealt card's place in the shoe, so the shoe still holds every
+        card once.
+
+        Args:
+            rng (:obj:`random.Random`, optional): The random number generator
+                used to shuffle. The deck's own generator is used if not given.
+            unseen_card (:obj:`Card`, optional): A card dealt in the current
+                round, shuffled together with the undealt ones.
+
+        Returns:
+            :obj:`Card`: The card that takes the place of `unseen_card`,
+                None if no card is given.
+
+        Raises:
+            ValueError: If `unseen_card` was not dealt in the current round.
+
+        """
+        cards = self._cards
+        undealt = cards[self._position:]
+        if unseen_card is not None:
+            for slot in range(self._position - 1, self._round_start - 1, -1):
+                if cards[slot] is unseen_card:
+                    break
+            else:
+                raise ValueError("The unseen card was not dealt in this round!")
+            undealt.append(unseen_card)
+        (self._rng if rng is None else rng).shuffle(undealt)
+        replacement = undealt.pop() if unseen_card is not None else None
+        cards[self._position:] = undealt
+        self._order_id = next(_ORDER_IDS)
+        if unseen_card is not None:
+            cards[slot] = replacement
+            self._value_counts[unseen_card.value] += 1
+            self._value_counts[replacement.value] -= 1
+        return replacement
+
+    def save_state(self):
+        """Saves the order of the cards, the position of the cursor and the counts.
+
+        The order is only copied if the cards have been shuffled since the
+        last saved state.
+
+        Returns:
+            tuple: The state of the deck, to pass to restore_state.
+
+        """
+        if self._saved_order_id != self._order_id:
+            self._saved_order = tuple(self._cards)
+            self._saved_order_id = self._order_id
+        return self._saved_order, self._order_id, self._position, self._round_start, tuple(self._value_counts)
+
+    def restore_state(self, state):
+        """Restores a state saved by save_state.
+
+        The order of the cards is only written back if they have been
+        shuffled since the state was saved.
+
+        Args:
+            state (tuple): The saved state.
+
+        """
+        order, order_id, self._position, self._round_start, value_counts = state
+        self._value_counts[:] = value_counts
+        if self._order_id != order_id:
+            self._cards[:] = order
+            self._order_id = order_id
+
+    def _shuffle_discards(self):
+        """Shuffles the discarded cards back in, keeping the cards in play.
+
+        The cards dealt in the current round are moved to the front of the
+        shoe and the discarded cards are shuffled behind them.
+
+        Raises:
+            RuntimeError: If there is no discarded card.
+
+        """
+        if self._round_start == 0:
+            raise RuntimeError("We run out of cards. The game ends.")
+        in_play = self._cards[self._round_start:]
+        discards = self._cards[:self._round_start]
+        self._rng.shuffle(discards)
+        self._cards[:len(in_play)] = in_play
+        self._cards[len(in_play):] = discards
+        self._order_id = next(_ORDER_IDS)
+        self._position = len(in_play)
+        self._reset_counts(in_play)
+        self._round_start = 0
 
     def __len__(self):
-        """Gets the length of the deck, i.e. the number of cards.
+        """Gets the length of the deck, i.e. the number of cards left to deal.
 
         Returns:
             int: The length of the deck, i.e. the number of cards.
 
         """
-        return len(self._cards)
\ No newline at end of file
+        return len(self._cards) - self._position
+
+    def remaining_counts(self):
+        """Gets the number of cards of each value left to deal.
+
+        Returns:
+            tuple: The number of cards of each value, from 1 ('A') to 10,
+                i.e. a composition as used by dealer_outcomes.
+
+        """
+        return tuple(self._value_counts[1:])
+
+    @property
+    def running_count(self):
+        """int: The sum of the Hi-Lo tags of the cards missing from the shoe."""
+        counts = self._value_counts
+        return sum((full * self.num_decks - counts[value]) * HI_LO_TAGS[value]
+                   for value, full in enumerate(VALUE_COUNTS, 1))
+
+    def true_count(self):
+        """Gets the Hi-Lo running count per deck left to deal.
+
+        Returns:
+            float: The running count divided by the number of decks left,
+                0 if the shoe is empty.
+
+        """
+        num_cards = len(self)
+        return self.running_count * 52 / num_cards if num_cards else 0.0
+
+    def next_card_probabilities(self):
+        """Gets the probability of each value for the next card dealt.
+
+        Returns:
+            tuple: The probability of each value, from 1 ('A') to 10. All
+                zero if the shoe is empty.
+
+        """
+        num_cards = len(self)
+        if not num_cards:
+            return (0.0,) * len(VALUE_COUNTS)
+        return tuple(count / num_cards for count in self._value_counts[1:])
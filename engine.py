@@ -0,0 +1,237 @@
+import random
+
+from dealer import Dealer
+from player import ComputerPlayer, HumanPlayer
+from record import RoundRecord
+from rules import resolve_rules
+from snapshot import TableSnapshot
+
+
+class RoundResult:
+    """The outcome of a round played by the headless engine.
+
+    Attributes:
+        player_names (:obj:`list` of :obj:`str`): The names of all players,
+            the dealer being the last one.
+        scores (:obj:`list` of int): The final score of each player.
+        busts (:obj:`list` of bool): The bust status of each player.
+        cards (:obj:`list` of :obj:`list` of :obj:`Card`): The cards drawn
+            by each player during the round, in dealing order.
+        winners (:obj:`list` of :obj:`str`): The names of the winners. Empty
+            if everyone busts.
+        seed (int): The seed of the round, None if the round was dealt from
+            the running shoe.
+        hits (:obj:`list` of int): The number of hits of each player, the
+            dealer excluded.
+
+    """
+    __slots__ = ('player_names', 'scores', 'busts', 'cards', 'winners', 'seed', 'hits')
+
+    def __init__(self, player_names, scores, busts, cards, winners, seed=None, hits=None):
+        """Constructs an instance of RoundResult.
+
+        Args:
+            player_names (:obj:`list` of :obj:`str`): The names of all players.
+            scores (:obj:`list` of int): The final score of each player.
+            busts (:obj:`list` of bool): The bust status of each player.
+            cards (:obj:`list` of :obj:`list` of :obj:`Card`): The cards
+                drawn by each player.
+            winners (:obj:`list` of :obj:`str`): The names of the winners.
+            seed (int, optional): The seed of the round.
+            hits (:obj:`list` of int, optional): The number of hits of
+                each player.
+
+        """
+        self.player_names = player_names
+        self.scores = scores
+        self.busts = busts
+        self.cards = cards
+        self.winners = winners
+        self.seed = seed
+        self.hits = hits
+
+    def to_record(self, num_decks):
+        """Gets the compact record of the round, to replay it later.
+
+        Args:
+            num_decks (int): The number of decks in the shoe.
+
+        Returns:
+            :obj:`RoundRecord`: The record of the round.
+
+        Raises:
+            ValueError: If the round has no seed, i.e. it cannot be replayed.
+
+        """
+        if self.seed is None:
+            raise ValueError("Only a round dealt from its own seed can be recorded!")
+        return RoundRecord(self.seed, num_decks, self.hits, self.scores)
+
+
+class Engine:
+    """A headless engine that plays complete rounds without any input or output.
+
+    The engine follows the same rules as Game: the dealing order of
+    Dealer.deal_cards_for_initiation, the scoring of Player, and the
+    dealer and winner rules looked up in the tables of its Rules.
+    Unlike Game, the dealer and the players are kept across rounds, and
+    the shoe is dealt through round after round until the cut card is
+    reached. Players who look at the table, i.e. who have a sit_at
+    method, are seated when the engine is constructed.
+
+    Attributes:
+        dealer (:obj:`Dealer`): The dealer of the table.
+        all_players (:obj:`list` of :obj:`Player`): A list of players,
+            the dealer being the last one.
+        player_names (:obj:`list` of :obj:`str`): The names of all players.
+        rng (:obj:`random.Random`): The random number generator of the table.
+        record (bool): True if every round is dealt from its own seed, so
+            that it can be replayed, False otherwise.
+        rules (:obj:`Rules`): The rules of the table.
+
+    """
+
+    def __init__(self, num_computer_player=1, players=None, num_decks=None, penetration=0.75, seed=None,
+                 record=False, rules=None):
+        """Constructs an instance of Engine.
+
+        Args:
+            num_computer_player (int): The number of computer players
+                (default to be 1). Ignored if `players` is given.
+            players (:obj:`list` of :obj:`Player`, optional): The players
+                sitting at the table, excluding the dealer.
+            num_decks (int, optional): The number of decks in the shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0.75).
+            seed (int, optional): The seed of the table's random number
+                generator, which shuffles the deck and drives the computer
+                players created by the engine. Rounds are reproducible for
+                a given seed.
+            record (bool): True to deal every round from its own seed,
+                drawn from the table's generator, so that each round can
+                be replayed on its own. The shoe is then reshuffled before
+                every round (default to be False).
+            rules (:obj:`Rules`, optional): The rules of the table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If there is no player, if a human player is
+                seated, since a human decision would block on input, if
+                `num_decks` is not the number of decks of `rules`, or if a
+                player cannot play under the rules of the table.
+
+        """
+        rules = resolve_rules(num_decks, rules)
+        self.rng = random.Random(seed)
+        if players is None:
+            players = [ComputerPlayer(_, self.rng) for _ in range(1, num_computer_player + 1)]
+        if len(players) < 1:
+            raise ValueError("The table must have at least one player!")
+        if any(isinstance(player, HumanPlayer) for player in players):
+            raise ValueError("Human players cannot play on a headless table!")
+
+        self.dealer = Dealer(penetration=penetration, rng=self.rng, rules=rules)
+        self.rules = self.dealer.rules
+        self.all_players = list(players)
+        self.all_players.append(self.dealer)
+        self.player_names = [player.player_name for player in self.all_players]
+        self.record = record
+        for player in players:
+            if hasattr(player, 'sit_at'):
+                player.sit_at(self)
+
+    def play_round(self, seed=None):
+        """Plays a complete round.
+
+        Args:
+            seed (int, optional): The seed of the round. If given, the
+                round is dealt from a shoe shuffled from it, see
+                Deck.begin_round. A seed is drawn if the table records its
+                rounds.
+
+        Returns:
+            :obj:`RoundResult`: The outcome of the round.
+
+        Raises:
+            ValueError: If the number of cards required by the initial
+                dealing exceeds the number of cards in the deck.
+            RuntimeError: If the players hold every card of the shoe and
+                another card is needed.
+
+        """
+        dealer = self.dealer
+        deck = dealer.deck
+        all_players = self.all_players
+
+        for player in all_players:
+            player.reset()
+
+        if seed is None and self.record:
+            seed = self.rng.getrandbits(64)
+        cards_to_deal = len(all_players) * 2
+        deck.begin_round(cards_to_deal, seed)
+        if cards_to_deal > len(deck):
+            raise ValueError("Too many players and not enough card.")
+
+        for player in all_players:
+            player.hands.append(deck.deal_card())
+        for player in all_players:
+            player.hands.append(deck.deal_card())
+            player.initiate_score()
+
+        dealer_upcard = dealer.hands[0]
+        hits = []
+        for player in all_players[:-1]:
+            hand = player.hand
+            num_hits = 0
+            while not hand.is_bust:
+                if player.get_decision(dealer_upcard) == 2:
+                    break
+                dealer.hit(player)
+                num_hits += 1
+            hits.append(num_hits)
+
+        dealer.is_dealer_turn_started = True
+        while dealer.must_hit():
+            dealer.hit(dealer)
+
+        return RoundResult(self.player_names,
+                           [player.hand.total for player in all_players],
+                           [player.hand.is_bust for player in all_players],
+                           [player.hands for player in all_players],
+                           [winner.player_name for winner in self.rules.find_winners(all_players)],
+                           seed, hits)
+
+    def snapshot(self):
+        """Takes a snapshot of the table, to go back to it later.
+
+        Returns:
+            :obj:`TableSnapshot`: The state of the deck, of every hand and
+                of the dealer's turn.
+
+        """
+        return TableSnapshot(self)
+
+    def restore(self, snapshot):
+        """Goes back to the state of a snapshot.
+
+        Args:
+            snapshot (:obj:`TableSnapshot`): A snapshot of this table.
+
+        """
+        snapshot.restore(self)
+
+    def play_rounds(self, num_rounds):
+        """Plays a number of rounds one after another.
+
+        Args:
+            num_rounds (int): The number of rounds to play.
+
+        Yields:
+            :obj:`RoundResult`: The outcome of each round.
+
+        """
+        for _ in range(num_rounds):
+            yield self.play_round()
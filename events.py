@@ -0,0 +1,274 @@
+import json
+import sys
+
+
+class EventSink:
+    """A consumer of the events of a game.
+
+    The game reports what happens through one method per event type:
+    deal, hit, stand, bust, reveal and result, plus the display of the
+    game state and the start and end of the turns. The events carry the
+    objects involved rather than text, so nothing is formatted unless a
+    sink does it.
+
+    The base class discards every event and formats nothing.
+
+    """
+
+    def deal(self, players):
+        """The initial cards have been dealt.
+
+        Args:
+            players (:obj:`list` of :obj:`Player`): All players, the dealer
+                being the last one.
+
+        """
+        pass
+
+    def state(self, players):
+        """The game state is displayed.
+
+        Args:
+            players (:obj:`list` of :obj:`Player`): All players, the dealer
+                being the last one.
+
+        """
+        pass
+
+    def players_turn_start(self):
+        """The players' turn starts."""
+        pass
+
+    def hit(self, player, card):
+        """A player, or the dealer, hit and got a card.
+
+        Args:
+            player (:obj:`Player`): The player who hit.
+            card (:obj:`Card`): The card dealt to the player.
+
+        """
+        pass
+
+    def stand(self, player):
+        """A player chose to stand.
+
+        Args:
+            player (:obj:`Player`): The player who stands.
+
+        """
+        pass
+
+    def bust(self, player):
+        """A player, or the dealer, busts.
+
+        Args:
+            player (:obj:`Player`): The player who busts.
+
+        """
+        pass
+
+    def players_turn_end(self):
+        """The players' turn ends."""
+        pass
+
+    def reveal(self, dealer):
+        """The dealer's turn starts and the face-down card is revealed.
+
+        Args:
+            dealer (:obj:`Dealer`): The dealer.
+
+        """
+        pass
+
+    def dealer_turn_end(self, dealer):
+        """The dealer's turn ends.
+
+        Args:
+            dealer (:obj:`Dealer`): The dealer.
+
+        """
+        pass
+
+    def result(self, winners):
+        """The result of the round is declared.
+
+        Args:
+            winners (:obj:`list` of :obj:`Player`): The winners, empty if
+                everyone busts.
+
+        """
+        pass
+
+    def flush(self):
+        """Writes out any buffered output."""
+        pass
+
+
+class NullSink(EventSink):
+    """A sink that discards every event at no formatting cost."""
+    pass
+
+
+class ConsoleSink(EventSink):
+    """A sink that narrates the game as text, as printed to the console.
+
+    The text is buffered and written to the stream in one go when the sink
+    is flushed, e.g. before a human player is prompted.
+
+    Attributes:
+        stream (file): The stream the text is written to.
+
+    """
+
+    def __init__(self, stream=None):
+        """Constructs an instance of ConsoleSink.
+
+        Args:
+            stream (file, optional): The stream the text is written to.
+                Defaults to the standard output.
+
+        """
+        self.stream = stream
+        self._lines = []
+
+    def state(self, players):
+        """Displays each player, as Game.show_game_state did."""
+        self._lines.append("Current Game State:\n======================\n")
+        self._lines.append(''.join(str(player) for player in players) + "\n")
+
+    def players_turn_start(self):
+        """Narrates the start of the players' turn."""
+        self._lines.append("The players' turn starts.\n")
+
+    def hit(self, player, card):
+        """Narrates a hit and the new score."""
+        if player.player_name == "Dealer":
+            if player.rules.dealer_hits_soft_17:
+                self._lines.append("Dealer needs to hit (current score < 17, or a soft 17)\n")
+            else:
+                self._lines.append("Dealer needs to hit (current score < 17)\n")
+        else:
+            self._lines.append(player.player_name + " chose to hit\n")
+        self._lines.append(player.player_name + " got a new card: " + str(card) + "\n")
+        self._lines.append(player.player_name + "'s current score: " + str(player.score) + "\n")
+
+    def stand(self, player):
+        """Narrates a stand."""
+        self._lines.append(player.player_name + " chose to stand\n")
+
+    def bust(self, player):
+        """Narrates a bust."""
+        if player.player_name == "Dealer":
+            self._lines.append(player.player_name + " BUST!\n")
+        else:
+            self._lines.append(player.player_name + " BUST!\n\n")
+
+    def players_turn_end(self):
+        """Narrates the end of the players' turn."""
+        self._lines.append("The players' turn ends.\n\n")
+
+    def reveal(self, dealer):
+        """Narrates the start of the dealer's turn and the revealed card."""
+        self._lines.append("Dealer's turn starts.\n")
+        self._lines.append("Dealer reveals the face-down card: " + str(dealer.hands[1]) + "\n")
+        self._lines.append("Dealer's initial score is: " + str(dealer.score) + "\n")
+
+    def dealer_turn_end(self, dealer):
+        """Narrates the dealer's final score and the end of their turn."""
+        self._lines.append("Dealer's final score: " + str(dealer.score) + "\n")
+        self._lines.append("Dealer's turn ends.\n\n")
+
+    def result(self, winners):
+        """Narrates the winners."""
+        if len(winners) == 0:
+            self._lines.append("************ GAME RESULT ************\n")
+            self._lines.append("No winners! Everyone loses the game.\n\n")
+            return
+        self._lines.append("\n************ GAME RESULT ************\n")
+        self._lines.append("WINNER(S): " + ", ".join(winner.player_name for winner in winners) + "\n\n")
+
+    def flush(self):
+        """Writes the buffered text to the stream."""
+        if self._lines:
+            stream = sys.stdout if self.stream is None else self.stream
+            stream.write(''.join(self._lines))
+            stream.flush()
+            self._lines = []
+
+
+class JsonLinesSink(EventSink):
+    """A sink that logs every event as one JSON object per line.
+
+    The lines are buffered and written to the stream whenever the buffer
+    is full or the sink is flushed.
+
+    Attributes:
+        stream (file): The stream the lines are written to.
+        buffer_size (int): The number of lines buffered before writing.
+        hide_hole_card (bool): True if the dealer's face-down card is left
+            out of the deal event, e.g. for a player's client. The card is
+            then only sent by the reveal event.
+
+    """
+
+    def __init__(self, stream, buffer_size=1000, hide_hole_card=False):
+        """Constructs an instance of JsonLinesSink.
+
+        Args:
+            stream (file): The stream the lines are written to.
+            buffer_size (int): The number of lines buffered before writing
+                (default to be 1000).
+            hide_hole_card (bool): True to send the dealer's face-down card
+                as 'hidden' in the deal event (default to be False, i.e.
+                log every card).
+
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.hide_hole_card = hide_hole_card
+        self._lines = []
+
+    def _emit(self, event):
+        """Buffers an event as a JSON line.
+
+        Args:
+            event (dict): The event.
+
+        """
+        self._lines.append(json.dumps(event) + "\n")
+        if len(self._lines) >= self.buffer_size:
+            self.flush()
+
+    def deal(self, players):
+        """Logs the initial hands, the dealer's face-down card hidden if asked."""
+        hands = {player.player_name: [str(card) for card in player.hands] for player in players}
+        if self.hide_hole_card:
+            hands[players[-1].player_name][1] = "hidden"
+        self._emit({"event": "deal", "hands": hands})
+
+    def hit(self, player, card):
+        """Logs a hit."""
+        self._emit({"event": "hit", "player": player.player_name, "card": str(card), "score": player.score})
+
+    def stand(self, player):
+        """Logs a stand."""
+        self._emit({"event": "stand", "player": player.player_name, "score": player.score})
+
+    def bust(self, player):
+        """Logs a bust."""
+        self._emit({"event": "bust", "player": player.player_name, "score": player.score})
+
+    def reveal(self, dealer):
+        """Logs the revealed card."""
+        self._emit({"event": "reveal", "card": str(dealer.hands[1]), "score": dealer.score})
+
+    def result(self, winners):
+        """Logs the winners."""
+        self._emit({"event": "result", "winners": [winner.player_name for winner in winners]})
+
+    def flush(self):
+        """Writes the buffered lines to the stream."""
+        if self._lines:
+            self.stream.write(''.join(self._lines))
+            self.stream.flush()
+            self._lines = []
@@ -0,0 +1,239 @@
+from dealer_outcomes import BUST, INFINITE_DECK_PROBABILITIES, dealer_outcomes
+from player import ComputerPlayer
+from rules import DEFAULT_RULES, TIES_SHARED
+from strategy import BUSTED, DecisionTable, StrategyComputerPlayer, final_distribution, hand_total, scores_at_most
+
+
+def hit_probabilities(policy, rules=None):
+    """Converts a policy to the probability of hitting in every state.
+
+    Args:
+        policy: A DecisionTable, a StrategyComputerPlayer, a plain
+            ComputerPlayer (who hits with probability 0.5), a number (a
+            fixed probability of hitting), or a function of the player's
+            total, soft flag and the dealer's upcard value that returns
+            the probability of hitting.
+        rules (:obj:`Rules`, optional): The rules the policy plays under.
+            A decision table must suit them, see DecisionTable.suits. A
+            StrategyComputerPlayer who follows the basic strategy switches
+            to that of the rules. Tables are not checked if not given.
+
+    Returns:
+        callable: A function of the total, soft flag and upcard value
+            returning the probability of hitting.
+
+    Raises:
+        ValueError: If the policy is of none of these kinds, e.g. a
+            subclass of ComputerPlayer other than StrategyComputerPlayer,
+            whose decisions cannot be read as probabilities, or if its
+            decision table does not suit the rules.
+
+    """
+    if isinstance(policy, StrategyComputerPlayer):
+        if rules is not None:
+            policy.follow_rules(rules)
+        policy = DecisionTable(0, policy.decisions, policy.table_rules)
+    if isinstance(policy, DecisionTable):
+        if rules is not None and not policy.suits(rules):
+            raise ValueError("The decision table was solved for {!r}, not for {!r}!".format(policy.rules, rules))
+        decisions = policy.decisions
+
+        def follow_table(total, is_soft, upcard_value):
+            """Hits if the table says so."""
+            return 1.0 if decisions[(total * 2 + is_soft) * 11 + upcard_value] == 1 else 0.0
+
+        return follow_table
+    if type(policy) is ComputerPlayer:
+        policy = 0.5
+    elif isinstance(policy, ComputerPlayer):
+        raise ValueError("Unknown policy: {!r}".format(policy))
+    if isinstance(policy, (int, float)):
+        probability = float(policy)
+
+        def fixed(total, is_soft, upcard_value):
+            """Hits with a fixed probability."""
+            return probability
+
+        return fixed
+    if callable(policy):
+        return policy
+    raise ValueError("Unknown policy: {!r}".format(policy))
+
+
+class TableProbabilities:
+    """The exact probabilities of the outcomes of a round, per player.
+
+    Attributes:
+        player_names (:obj:`list` of :obj:`str`): The names of all players,
+            the dealer being the last one.
+        wins (:obj:`list` of float): The probability that each player wins alone.
+        ties (:obj:`list` of float): The probability that each player shares
+            the highest score with other players.
+        busts (:obj:`list` of float): The probability that each player busts.
+        no_winner (float): The probability that everyone busts.
+
+    """
+
+    def __init__(self, player_names):
+        """Constructs an instance of TableProbabilities with every probability at 0.
+
+        Args:
+            player_names (:obj:`list` of :obj:`str`): The names of all players.
+
+        """
+        self.player_names = list(player_names)
+        self.wins = [0.0] * len(player_names)
+        self.ties = [0.0] * len(player_names)
+        self.busts = [0.0] * len(player_names)
+        self.no_winner = 0.0
+
+    def __str__(self):
+        """Represents the probabilities as string, as Statistics does.
+
+        Returns:
+            str: One line per player with their probabilities.
+
+        """
+        lines = ["Exact, no winner: {:.4f}".format(self.no_winner)]
+        for index, name in enumerate(self.player_names):
+            lines.append("{}: win {:.4f}, tie {:.4f}, bust {:.4f}".format(
+                name, self.wins[index], self.ties[index], self.busts[index]))
+        return '\n'.join(lines)
+
+
+class InfiniteDeckCalculator:
+    """An exact calculator of the win, tie and bust probabilities of a table, for an infinite deck.
+
+    No round is sampled. Cards are drawn from an infinite deck, as in
+    BasicStrategySolver: given the dealer's upcard, the final scores of
+    the players and of the dealer are then independent. The calculator
+    gets the final score distribution of every seat from memoized
+    transitions between hand states (hard total, has an 'A'), weighted by
+    the seat's probability of hitting, and the dealer's from
+    dealer_outcomes, under the dealer rule of the rules. The outcome
+    probabilities follow from Rules.find_winners with shared ties: the
+    highest score that does not bust wins, and equal highest scores tie.
+
+    The probabilities are exact for an infinite deck only. A finite shoe
+    makes the seats depend on each other through the cards they take, so
+    its results differ, by more for fewer decks.
+
+    Attributes:
+        policies (:obj:`list` of callable): The hit probability function of
+            each seat, see hit_probabilities.
+        player_names (:obj:`list` of :obj:`str`): The names of all players,
+            the dealer being the last one.
+        rules (:obj:`Rules`): The rules of the table.
+
+    """
+
+    def __init__(self, policies, rules=None):
+        """Constructs an instance of InfiniteDeckCalculator.
+
+        Args:
+            policies (list): The policy of each seat, in seating order, see
+                hit_probabilities.
+            rules (:obj:`Rules`, optional): The rules of the table. The
+                rules of the original game are followed if not given.
+
+        Raises:
+            ValueError: If there is no seat, or if the rules do not share
+                ties or let a natural blackjack beat 21, which the
+                calculator does not support.
+
+        """
+        if len(policies) < 1:
+            raise ValueError("The table must have at least one player!")
+        if rules is None:
+            rules = DEFAULT_RULES
+        if rules.ties != TIES_SHARED or rules.blackjack_beats_21:
+            raise ValueError("The calculator only supports shared ties and no blackjack above 21: {!r}".format(rules))
+        self.rules = rules
+        self.policies = [hit_probabilities(policy, rules) for policy in policies]
+        self.player_names = ["Seat " + str(seat) for seat in range(1, len(policies) + 1)] + ["Dealer"]
+
+    def solve(self):
+        """Computes the outcome probabilities of every player.
+
+        Returns:
+            :obj:`TableProbabilities`: The probabilities.
+
+        """
+        num_players = len(self.player_names)
+        result = TableProbabilities(self.player_names)
+        seat_distributions = {}
+        for upcard_value in range(1, 11):
+            upcard_probability = INFINITE_DECK_PROBABILITIES[upcard_value - 1]
+            distributions = []
+            for policy in self.policies:
+                # Seats with the same policy share the same distribution.
+                key = (policy, upcard_value)
+                if key not in seat_distributions:
+                    seat_distributions[key] = _seat_distribution(policy, upcard_value)
+                distributions.append(seat_distributions[key])
+            distributions.append(_dealer_distribution(upcard_value, self.rules))
+
+            # at_most[k][s] is the probability that player k busts or ends
+            # on a score <= s.
+            at_most = [scores_at_most(distribution) for distribution in distributions]
+
+            no_winner = 1.0
+            for index, distribution in enumerate(distributions):
+                no_winner *= distribution[BUSTED]
+                result.busts[index] += upcard_probability * distribution[BUSTED]
+                win = tie = 0.0
+                for score in range(22):
+                    probability = distribution[score]
+                    if not probability:
+                        continue
+                    others_lower = others_at_most = 1.0
+                    for other in range(num_players):
+                        if other != index:
+                            others_lower *= at_most[other][score - 1] if score else distributions[other][BUSTED]
+                            others_at_most *= at_most[other][score]
+                    win += probability * others_lower
+                    tie += probability * (others_at_most - others_lower)
+                result.wins[index] += upcard_probability * win
+                result.ties[index] += upcard_probability * tie
+            result.no_winner += upcard_probability * no_winner
+        return result
+
+
+def _seat_distribution(policy, upcard_value):
+    """Gets a seat's final score distribution against an upcard.
+
+    Args:
+        policy (callable): The probability of hitting, see hit_probabilities.
+        upcard_value (int): The value of the dealer's face-up card.
+
+    Returns:
+        :obj:`list` of float: The probability of each final score from 0
+            to 21, followed by the probability of a bust.
+
+    """
+    def hit_probability(hard_total, has_ace):
+        """Asks the policy about the score and softness of a state."""
+        total = hand_total(hard_total, has_ace)
+        return policy(total, total != hard_total, upcard_value)
+
+    return final_distribution(hit_probability)
+
+
+def _dealer_distribution(upcard_value, rules):
+    """Gets the dealer's final score distribution for an upcard.
+
+    Args:
+        upcard_value (int): The value of the dealer's face-up card.
+        rules (:obj:`Rules`): The rules of the table.
+
+    Returns:
+        :obj:`list` of float: The probability of each final score from
+            0 to 21, followed by the probability of a bust.
+
+    """
+    outcomes = dealer_outcomes(upcard_value, rules=rules)
+    distribution = [0.0] * (BUSTED + 1)
+    for offset in range(BUST):
+        distribution[17 + offset] = outcomes[offset]
+    distribution[BUSTED] = outcomes[BUST]
+    return distribution
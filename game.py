@@ -1,7 +1,13 @@
+import random
 import sys
 
 from player import HumanPlayer, ComputerPlayer
 from dealer import Dealer
+from events import ConsoleSink
+from metrics import Instrumentation
+from record import RoundRecord
+from rules import resolve_rules
+from snapshot import TableSnapshot
 
 
 class Game:
@@ -11,44 +17,97 @@ class Game:
         dealer (:obj:`Dealer`): The dealer of the game.
         all_players (:obj:`list` of :obj:`Player`): A list of players, including human players,
             computer players and the dealer.
+        sink (:obj:`EventSink`): The consumer of the game's events.
+        instrumentation (:obj:`Instrumentation`): The measurements of the
+            game, None if the game is not instrumented.
+        records (:obj:`list` of :obj:`RoundRecord`): The record of every
+            round played, None if the game is not recorded.
+        round_seed (int): The seed the current round is dealt from, None
+            if the game is not recorded.
+        round_hits (:obj:`list` of int): The number of hits of each player
+            in the current round, the dealer excluded.
+        rules (:obj:`Rules`): The rules of the game.
 
     """
-    def __init__(self, num_human_player=1, num_computer_player=1):
+    def __init__(self, num_human_player=1, num_computer_player=1, num_decks=None, penetration=0.0, sink=None,
+                 record=False, rules=None):
         """Constructs an instance of Game.
 
         Args:
             num_human_player (int): The number of human players (default to be 1).
             num_computer_player (int): The number of computer players (default to be 1).
+            num_decks (int, optional): The number of decks in the shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0, i.e. reshuffle every round).
+            sink (:obj:`EventSink`, optional): The consumer of the game's
+                events. Defaults to a ConsoleSink, which narrates the game
+                on the standard output.
+            record (bool): True to deal every round from its own seed and
+                keep a record of it, decisions of human players included,
+                so that it can be replayed (default to be False).
+            rules (:obj:`Rules`, optional): The rules of the game. The rules
+                of the original game with `num_decks` decks are followed if
+                not given.
 
         Raises:
             ValueError: If the number of human player < 1 or the number of computer
-                player < 1.
+                player < 1. Also, and not caught, if `num_decks` is not the
+                number of decks of `rules` or if the players need more
+                cards than the shoe holds.
         """
+        self.rules = resolve_rules(num_decks, rules)
+        self.sink = ConsoleSink() if sink is None else sink
+        self.instrumentation = None
+        self.records = [] if record else None
         try:
             if num_human_player < 1 or num_computer_player < 1:
                 raise ValueError("The game must have at least one human player and one computer player!")
-            self.dealer = Dealer()
+            self.dealer = Dealer(penetration=penetration, rules=self.rules)
             self.all_players = [HumanPlayer(_) for _ in range(1, num_human_player + 1)]
             self.all_players.extend([ComputerPlayer(_) for _ in range(1, num_computer_player + 1)])
             self.all_players.append(self.dealer)
-            self.dealer.deal_cards_for_initiation(self)
+            for player in self.all_players[:-1]:
+                if hasattr(player, 'sit_at'):
+                    player.sit_at(self)
         except ValueError as player_num_error:
             print(player_num_error)
+        else:
+            self.prepare_round()
+            self.dealer.deal_cards_for_initiation(self)
+
+    def enable_instrumentation(self, instrumentation=None):
+        """Starts measuring the latency of each phase and counting events.
+
+        Args:
+            instrumentation (:obj:`Instrumentation`, optional): The
+                measurements to add to. New ones are created if not given.
+
+        Returns:
+            :obj:`Instrumentation`: The measurements of the game.
+
+        """
+        if self.instrumentation is not None:
+            self.disable_instrumentation()
+        self.instrumentation = Instrumentation() if instrumentation is None else instrumentation
+        self.instrumentation.attach(self)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stops measuring the game. The game then runs at full speed again."""
+        if self.instrumentation is not None:
+            Instrumentation.detach(self)
+            self.instrumentation = None
 
     def show_game_state(self):
         """Displays the game state.
 
         Displays each player as string, including player name,
-        hands of cards, score, bust status, etc.
-
-        Returns:
-            str: The string representation of the game state.
+        hands of cards, score, bust status, etc. The strings are only
+        built if the sink displays them.
 
         """
-        print("Current Game State:")
-        print("======================")
-        all_players_string = ''.join(str(player) for player in self.all_players)
-        print(all_players_string)
+        self.sink.state(self.all_players)
 
     def players_turn(self):
         """Starts the players' turn.
@@ -58,36 +117,54 @@ class Game:
         or they busts.
 
         """
-        print("The players' turn starts.")
+        sink = self.sink
+        sink.players_turn_start()
+        dealer_upcard = self.dealer.hands[0]
         for current_player_index, current_player in enumerate(self.all_players[:-1]):
-            while current_player.score <= 21:
-                decision_code = current_player.get_decision()
-                if decision_code == 2:
-                    print(current_player.player_name + " chose to stand")
-                    break
-                print(current_player.player_name + " chose to hit")
-                self.dealer.deal_cards_for_hit(self, current_player_index)
-
-            if current_player.score > 21:
-                current_player.is_bust = True
-                print(current_player.player_name + " BUST!\n")
-        print("The players' turn ends.\n")
+            is_turn_over = current_player.hand.is_bust
+            while not is_turn_over:
+                if isinstance(current_player, HumanPlayer):
+                    sink.flush()
+                decision_code = current_player.get_decision(dealer_upcard)
+                is_turn_over = self.apply_decision(current_player_index, decision_code)
+        sink.players_turn_end()
+
+    def apply_decision(self, player_index, decision_code):
+        """Carries out a player's decision of 'hit' or 'stand'.
+
+        Args:
+            player_index (int): The index of the player in the all_players list.
+            decision_code (int): A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        Returns:
+            bool: True if the player's turn is over, i.e. they stand or
+                bust, False otherwise.
+
+        """
+        player = self.all_players[player_index]
+        if decision_code == 2:
+            self.sink.stand(player)
+            return True
+        self.round_hits[player_index] += 1
+        self.dealer.deal_cards_for_hit(self, player_index)
+        if player.hand.is_bust:
+            self.sink.bust(player)
+            return True
+        return False
 
     def dealer_turn(self):
         """Starts the dealer's turn.
 
         The dealer reveals the face-down card and then stands if their score
-        >= 17, otherwise they hits until their score >= 17. If the dealer's
-        score ever exceeds 21, they busts.
+        >= 17, otherwise they hits until their score >= 17, or past a soft
+        17 if the rules say so. If the dealer's score ever exceeds 21, they
+        busts.
 
         """
-        print("Dealer's turn starts.")
-        print("Dealer reveals the face-down card: " + str(self.dealer.hands[1]))
-        print("Dealer's initial score is: " + str(self.dealer.score))
+        self.sink.reveal(self.dealer)
         self.dealer.is_dealer_turn_started = True
         self.dealer.get_decision(self)
-        print("Dealer's final score: " + str(self.dealer.score))
-        print("Dealer's turn ends.\n")
+        self.sink.dealer_turn_end(self.dealer)
 
     def declare_result(self):
         """Declares the result of the game.
@@ -96,46 +173,144 @@ class Game:
         in these players. Players with the highest score are winners. If everyone
         busts, then there is no winner, i.e. everyone loses the game.
 
-        When deciding the highest score, we only consider the rank.
+        When deciding the highest score, we only consider the rank, and
+        ties follow the tie rule, see Rules.find_winners.
+
+        """
+        self.sink.result(self.rules.find_winners(self.all_players))
+
+    def start_new_round(self):
+        """Starts a new round with the same dealer, deck and players.
+
+        The players' hands are cleared and the dealer deals again from the
+        same deck, which is reshuffled once the cut card has been reached.
+        No new Dealer, Deck, Card or Player is created.
+
+        """
+        for player in self.all_players:
+            player.reset()
+        self.prepare_round()
+        self.dealer.deal_cards_for_initiation(self)
+
+    def snapshot(self):
+        """Takes a snapshot of the round, to go back to it later.
+
+        Returns:
+            :obj:`TableSnapshot`: The state of the deck, of every hand, of
+                the dealer's turn and of the hit counts.
+
+        """
+        snapshot = TableSnapshot(self)
+        snapshot.round_hits = tuple(self.round_hits)
+        return snapshot
+
+    def restore(self, snapshot):
+        """Goes back to the state of a snapshot, without any output.
+
+        Args:
+            snapshot (:obj:`TableSnapshot`): A snapshot of this game.
 
         """
-        potential_winners = list(filter(lambda player: not player.is_bust, self.all_players))
-        if len(potential_winners) == 0:
-            print("************ GAME RESULT ************")
-            print("No winners! Everyone loses the game.\n")
-            return
-        max_score = max([player.score for player in potential_winners])
-        winners = [player.player_name for player in potential_winners if player.score = max_score]
-        # winners = list(map(lambda player: player.player_name,
-        #                    filter(lambda player: player.score == max_score, potential_winners)))
-        print("\n************ GAME RESULT ************")
-        print("WINNER(S): " + ", ".join(winners) + '\n')
+        snapshot.restore(self)
+        if snapshot.round_hits is not None:
+            self.round_hits[:] = snapshot.round_hits
+
+    def prepare_round(self):
+        """Draws the seed of the next round, if recorded, and clears the hit counts."""
+        self.round_seed = random.getrandbits(64) if self.records is not None else None
+        self.round_hits = [0] * (len(self.all_players) - 1)
+
+    def record_round(self):
+        """Keeps the record of the round just played, if the game is recorded."""
+        if self.records is not None:
+            self.records.append(RoundRecord(self.round_seed, self.dealer.deck.num_decks, list(self.round_hits),
+                                            [player.hand.total for player in self.all_players]))
 
     @staticmethod
     def prompt_new_round():
-        """Interactively prompts the human player if they wants to start new round or quits."""
+        """Interactively prompts the human player if they wants to start new round or quits.
+
+        Returns:
+            bool: True if a new round starts, False if the human player quits.
+
+        """
         while True:
             try:
                 message = "Want another around? 1-yes, 2-no\n"
                 decision = int(input(message))
                 if decision == 1:
                     print("A new round starts:\n")
-                    game = Game()
-                    game.play()
+                    return True
                 elif decision == 2:
                     print("Bye-bye!")
-                    sys.exit(1)
+                    return False
                 else:
                     print("Invalid number. Please enter 1 or 2.")
             except ValueError:
                 print("Invalid value. Please enter a valid choice.")
                 continue
 
-    def play(self):
-        """Plays the game."""
+    def play_round(self):
+        """Plays the current round."""
         self.show_game_state()
         self.players_turn()
         self.dealer_turn()
         self.show_game_state()
         self.declare_result()
-        Game.prompt_new_round()
\ No newline at end of file
+        self.record_round()
+        self.sink.flush()
+
+    def play(self):
+        """Plays the game, round after round, until the human player quits.
+
+        The game ends, and the program with it, if the dealer cannot deal.
+
+        """
+        try:
+            Session(self).run()
+        except (ValueError, RuntimeError) as dealing_error:
+            print(dealing_error)
+            sys.exit(1)
+
+
+class Session:
+    """A series of rounds played at the same table.
+
+    Rounds are played in a flat loop. The dealer, the deck and the players
+    are reused across rounds, so memory use and setup cost per round stay
+    constant however long the session runs.
+
+    Attributes:
+        game (:obj:`Game`): The game whose table is reused in every round.
+        rounds_played (int): The number of rounds played so far.
+
+    """
+
+    def __init__(self, game=None):
+        """Constructs an instance of Session.
+
+        Args:
+            game (:obj:`Game`, optional): The game to play. A game with the
+                default number of players is created if not given.
+
+        """
+        self.game = Game() if game is None else game
+        self.rounds_played = 0
+
+    def run(self, num_rounds=None):
+        """Plays rounds until the human player quits or enough rounds are played.
+
+        Args:
+            num_rounds (int, optional): The maximum number of rounds to play.
+                If not given, the human player is prompted after every round.
+
+        """
+        while True:
+            if self.rounds_played > 0:
+                self.game.start_new_round()
+            self.game.play_round()
+            self.rounds_played += 1
+            if num_rounds is not None and self.rounds_played >= num_rounds:
+                return
+            if not Game.prompt_new_round():
+                return
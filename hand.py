@@ -0,0 +1,79 @@
+class HandState:
+    """The value of a hand of cards, updated incrementally.
+
+    The hand keeps its hard total, i.e. the sum of the card values with
+    every 'A' counted as 1, and the number of 'A's. At most one 'A' can be
+    counted as 11 without a bust, so the best total is the hard total plus
+    10 if the hand holds an 'A' and that does not exceed 21. Such a hand is
+    soft: a later card can always count the 'A' back down to 1.
+
+    Adding a card costs O(1) and the hand is never rescanned.
+
+    Attributes:
+        hard_total (int): The sum of the card values, 'A' counted as 1.
+        num_aces (int): The number of 'A's in the hand.
+        num_cards (int): The number of cards in the hand.
+        total (int): The best total of the hand, i.e. the score.
+        is_soft (bool): True if an 'A' is counted as 11, False otherwise.
+        is_bust (bool): True if the total exceeds 21, False otherwise.
+        is_blackjack (bool): True if the hand is an 'A' and a 10-valued
+            card as the first two cards, False otherwise.
+
+    """
+    __slots__ = ('hard_total', 'num_aces', 'num_cards', 'total', 'is_soft', 'is_bust', 'is_blackjack')
+
+    def __init__(self):
+        """Constructs an empty instance of HandState."""
+        self.reset()
+
+    def reset(self):
+        """Empties the hand."""
+        self.hard_total = 0
+        self.num_aces = 0
+        self.num_cards = 0
+        self.total = 0
+        self.is_soft = False
+        self.is_bust = False
+        self.is_blackjack = False
+
+    def add(self, card):
+        """Adds a card to the hand and updates the totals.
+
+        Args:
+            card (:obj:`Card`): The card to add.
+
+        """
+        hard_total = self.hard_total + card.value
+        self.hard_total = hard_total
+        if card.is_ace:
+            self.num_aces += 1
+        self.num_cards += 1
+
+        if self.num_aces and hard_total <= 11:
+            self.total = hard_total + 10
+            self.is_soft = True
+        else:
+            self.total = hard_total
+            self.is_soft = False
+        self.is_bust = hard_total > 21
+        self.is_blackjack = self.num_cards == 2 and self.total == 21
+
+    def save(self):
+        """Saves the values of the hand.
+
+        Returns:
+            tuple: The values of the hand, to pass to restore.
+
+        """
+        return (self.hard_total, self.num_aces, self.num_cards, self.total, self.is_soft, self.is_bust,
+                self.is_blackjack)
+
+    def restore(self, state):
+        """Restores the values saved by save.
+
+        Args:
+            state (tuple): The saved values.
+
+        """
+        (self.hard_total, self.num_aces, self.num_cards, self.total, self.is_soft, self.is_bust,
+         self.is_blackjack) = state
@@ -0,0 +1,196 @@
+import random
+
+from player import ComputerPlayer
+from snapshot import TableSnapshot
+from strategy import StrategyComputerPlayer
+
+
+class LookaheadComputerPlayer(ComputerPlayer):
+    """A computer player who decides by playing the rest of the round out.
+
+    At each decision the player snapshots the table and plays many
+    branches of the rest of the round, once after hitting and once after
+    standing, and picks the decision that ends among the winners more
+    often. The player does not peek: in every branch the undealt cards
+    and the dealer's face-down card are shuffled first, and both decisions
+    of a branch are played out from the same shuffle.
+
+    In a branch, the computer players seated after this player decide as
+    they would, but draw from a scratch generator seeded from this
+    player's one: the branches never advance the generators of the
+    table, so they do not change later shuffles or decisions. This
+    player, once their first decision is made, and the players who cannot
+    be asked, i.e. human players and the players who look at the table,
+    such as other lookahead players, follow the rollout table if given,
+    and draw as the dealer does under the rules of the table otherwise.
+    The dealer and the winners follow the rules of the table.
+
+    Attributes:
+        player_name (str): The name of the player.
+        hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
+        is_bust (bool): True if the player busts, False otherwise.
+        score (int): The player's score.
+        rng (:obj:`random.Random`): The random number generator used to
+            shuffle the branches.
+        num_branches (int): The number of branches played per decision.
+        rollout_table (:obj:`DecisionTable`): The decisions followed in the
+            branches, None for the dealer's rule.
+        table (:obj:`Game` or :obj:`Engine`): The table the player sits at.
+
+    """
+
+    def __init__(self, player_number, num_branches=200, rollout_table=None, rng=None):
+        """Constructs an instance of LookaheadComputerPlayer.
+
+        Args:
+            player_number (int): The serial number of the player, starting
+                from 1. The serial number is unique among computer players.
+            num_branches (int): The number of branches played per decision
+                (default to be 200).
+            rollout_table (:obj:`DecisionTable`, optional): The decisions
+                followed in the branches. The dealer's rule of the table is
+                followed if not given.
+            rng (:obj:`random.Random`, optional): The random number generator
+                used to shuffle the branches.
+        """
+        super().__init__(player_number, rng)
+        self.num_branches = num_branches
+        self.rollout_table = rollout_table
+        self.table = None
+
+    def sit_at(self, table):
+        """Seats the player at a table, whose state the player looks ahead from.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): A table the player is one
+                of the players of.
+
+        """
+        self.table = table
+
+    def get_decision(self, dealer_upcard=None):
+        """Gets the decision that wins more often over the branches.
+
+        Args:
+            dealer_upcard (:obj:`Card`): The dealer's face-up card.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        Raises:
+            RuntimeError: If the player is not seated at a table.
+
+        """
+        if self.table is None:
+            raise RuntimeError(self.player_name + " must sit at a table to look ahead!")
+        hit_wins, stand_wins = self.evaluate(self.table)
+        return 1 if hit_wins > stand_wins else 2
+
+    def evaluate(self, table):
+        """Counts the branches won after hitting and after standing.
+
+        The table is left in the state it was found in.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): The table, at this
+                player's decision.
+
+        Returns:
+            tuple: The number of branches won after hitting, and after standing.
+
+        """
+        dealer = table.dealer
+        deck = dealer.deck
+        seat = table.all_players.index(self)
+        asked = [player for player in table.all_players[seat + 1:-1] if self._can_ask(player)]
+        generators = [player.rng for player in asked]
+        scratch = random.Random(self.rng.getrandbits(64))
+        for player in asked:
+            player.rng = scratch
+        start = TableSnapshot(table)
+        wins = [0, 0]
+        try:
+            for _ in range(self.num_branches):
+                dealer.hands[1] = deck.shuffle_undealt(self.rng, dealer.hands[1])
+                dealer.initiate_score()
+                branch = TableSnapshot(table)
+                for decision_code in (1, 2):
+                    if decision_code == 2:
+                        branch.restore(table)
+                    wins[decision_code - 1] += self._play_out(table, seat, decision_code)
+                start.restore(table)
+        finally:
+            for player, generator in zip(asked, generators):
+                player.rng = generator
+        return wins[0], wins[1]
+
+    @staticmethod
+    def _can_ask(player):
+        """Checks whether a player can be asked for their decisions in a branch.
+
+        Args:
+            player (:obj:`Player`): A player seated after this player.
+
+        Returns:
+            bool: True for computer players who decide from their hand and
+                the upcard, False for the players who follow the rollout
+                policy.
+
+        """
+        if isinstance(player, StrategyComputerPlayer):
+            return True
+        return isinstance(player, ComputerPlayer) and not hasattr(player, 'sit_at')
+
+    def _rollout_decision(self, player, dealer):
+        """Gets the decision of a player who follows the rollout policy.
+
+        Args:
+            player (:obj:`Player`): The player.
+            dealer (:obj:`Dealer`): The dealer of the table.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        """
+        hand = player.hand
+        if self.rollout_table is None:
+            return 1 if dealer.rules.dealer_must_hit(hand) else 2
+        return self.rollout_table.lookup(hand.total, hand.is_soft, dealer.hands[0].value)
+
+    def _play_out(self, table, seat, decision_code):
+        """Plays the rest of the round silently from a decision.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): The table.
+            seat (int): The index of this player in the all_players list.
+            decision_code (int): This player's decision, 1 for 'hit', 2 for
+                'stand'.
+
+        Returns:
+            int: 1 if this player ends among the winners, 0 otherwise.
+
+        """
+        dealer = table.dealer
+        players = table.all_players
+        dealer_upcard = dealer.hands[0]
+        try:
+            while decision_code == 1 and not self.hand.is_bust:
+                dealer.hit(self)
+                decision_code = self._rollout_decision(self, dealer)
+            for player in players[seat + 1:-1]:
+                hand = player.hand
+                can_ask = self._can_ask(player)
+                while not hand.is_bust:
+                    if can_ask:
+                        decision_code = player.get_decision(dealer_upcard)
+                    else:
+                        decision_code = self._rollout_decision(player, dealer)
+                    if decision_code == 2:
+                        break
+                    dealer.hit(player)
+            while dealer.must_hit():
+                dealer.hit(dealer)
+        except RuntimeError:
+            return 0
+        return 1 if any(winner is self for winner in table.rules.find_winners(players)) else 0
@@ -0,0 +1,193 @@
+import bisect
+import os
+import time
+
+# The phases of a round that are timed, in order.
+PHASES = ('deal', 'players_turn', 'dealer_turn', 'declare_result')
+
+# The counters that are kept.
+COUNTERS = ('cards_dealt', 'hits', 'busts', 'reshuffles')
+
+# The upper bounds of the latency histogram buckets, in nanoseconds. A last
+# bucket catches every longer latency.
+BUCKET_BOUNDS_NS = (500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000,
+                    500000, 1000000, 2000000, 5000000, 10000000)
+
+
+class Instrumentation:
+    """Per-phase latency histograms and counters of a game.
+
+    The histograms and counters are preallocated lists, so recording a
+    measurement never allocates. A game is instrumented by attaching an
+    instance of Instrumentation to it, which shadows the timed methods of
+    the game, its dealer and its deck with measuring wrappers. Detaching
+    removes the wrappers, so a game that is not instrumented runs exactly
+    the same code as before and pays nothing.
+
+    Attributes:
+        bucket_counts (:obj:`list` of :obj:`list` of int): The number of
+            latencies in each bucket, per phase.
+        latency_sums_ns (:obj:`list` of int): The sum of the latencies per
+            phase, in nanoseconds.
+        counters (:obj:`list` of int): The value of each counter, in the
+            order of COUNTERS.
+
+    """
+
+    def __init__(self):
+        """Constructs an instance of Instrumentation with empty measurements."""
+        self.bucket_counts = [[0] * (len(BUCKET_BOUNDS_NS) + 1) for _ in PHASES]
+        self.latency_sums_ns = [0] * len(PHASES)
+        self.counters = [0] * len(COUNTERS)
+
+    def observe(self, phase_index, latency_ns):
+        """Records the latency of a phase.
+
+        Args:
+            phase_index (int): The index of the phase in PHASES.
+            latency_ns (int): The latency, in nanoseconds.
+
+        """
+        self.bucket_counts[phase_index][bisect.bisect_left(BUCKET_BOUNDS_NS, latency_ns)] += 1
+        self.latency_sums_ns[phase_index] += latency_ns
+
+    def _timed(self, phase, method):
+        """Wraps a method so that each call records the latency of a phase.
+
+        Args:
+            phase (str): The name of the phase.
+            method (callable): The bound method to wrap.
+
+        Returns:
+            callable: The wrapper.
+
+        """
+        phase_index = PHASES.index(phase)
+        observe = self.observe
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            """Calls the method and records its latency."""
+            start = clock()
+            result = method(*args)
+            observe(phase_index, clock() - start)
+            return result
+
+        return timed
+
+    def _counted(self, counter, method):
+        """Wraps a method so that each call increments a counter.
+
+        Args:
+            counter (str): The name of the counter.
+            method (callable): The bound method to wrap.
+
+        Returns:
+            callable: The wrapper.
+
+        """
+        counter_index = COUNTERS.index(counter)
+        counters = self.counters
+
+        def counted(*args):
+            """Increments the counter and calls the method."""
+            counters[counter_index] += 1
+            return method(*args)
+
+        return counted
+
+    def attach(self, game):
+        """Starts measuring a game.
+
+        Args:
+            game (:obj:`Game`): The game to measure.
+
+        """
+        dealer = game.dealer
+        deck = dealer.deck
+        busts = COUNTERS.index('busts')
+        counters = self.counters
+        declare_result = self._timed('declare_result', game.declare_result)
+
+        def declare_result_counting_busts():
+            """Counts the players who bust and declares the result."""
+            counters[busts] += sum(1 for player in game.all_players if player.hand.is_bust)
+            return declare_result()
+
+        dealer.deal_cards_for_initiation = self._timed('deal', dealer.deal_cards_for_initiation)
+        dealer.hit = self._counted('hits', dealer.hit)
+        deck.deal_card = self._counted('cards_dealt', deck.deal_card)
+        deck.shuffle = self._counted('reshuffles', deck.shuffle)
+        deck._shuffle_discards = self._counted('reshuffles', deck._shuffle_discards)
+        game.players_turn = self._timed('players_turn', game.players_turn)
+        game.dealer_turn = self._timed('dealer_turn', game.dealer_turn)
+        game.declare_result = declare_result_counting_busts
+
+    @staticmethod
+    def detach(game):
+        """Stops measuring a game and removes every wrapper.
+
+        Args:
+            game (:obj:`Game`): The game measured so far.
+
+        """
+        for owner, names in ((game.dealer, ('deal_cards_for_initiation', 'hit')),
+                             (game.dealer.deck, ('deal_card', 'shuffle', '_shuffle_discards')),
+                             (game, ('players_turn', 'dealer_turn', 'declare_result'))):
+            for name in names:
+                owner.__dict__.pop(name, None)
+
+    def snapshot(self):
+        """Gets a copy of the current measurements.
+
+        Returns:
+            dict: The histogram of each phase, with its bucket bounds in
+                nanoseconds, bucket counts, latency count and latency sum,
+                and the value of each counter.
+
+        """
+        phases = {}
+        for phase_index, phase in enumerate(PHASES):
+            bucket_counts = self.bucket_counts[phase_index]
+            phases[phase] = {'bucket_bounds_ns': list(BUCKET_BOUNDS_NS),
+                             'bucket_counts': list(bucket_counts),
+                             'count': sum(bucket_counts),
+                             'sum_ns': self.latency_sums_ns[phase_index]}
+        return {'phases': phases, 'counters': dict(zip(COUNTERS, self.counters))}
+
+    def export_text(self):
+        """Formats the measurements in the Prometheus text exposition format.
+
+        Returns:
+            str: The measurements, readable by a Prometheus-compatible scraper.
+
+        """
+        lines = ["# HELP blackjack_phase_seconds Latency of each phase of a round.",
+                 "# TYPE blackjack_phase_seconds histogram"]
+        for phase_index, phase in enumerate(PHASES):
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS_NS + (None,), self.bucket_counts[phase_index]):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(bound / 1e9)
+                lines.append('blackjack_phase_seconds_bucket{{phase="{}",le="{}"}} {}'.format(phase, le, cumulative))
+            lines.append('blackjack_phase_seconds_sum{{phase="{}"}} {!r}'.format(
+                phase, self.latency_sums_ns[phase_index] / 1e9))
+            lines.append('blackjack_phase_seconds_count{{phase="{}"}} {}'.format(phase, cumulative))
+        for counter, value in zip(COUNTERS, self.counters):
+            lines.append("# TYPE blackjack_{}_total counter".format(counter))
+            lines.append("blackjack_{}_total {}".format(counter, value))
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Writes the exported measurements to a file, replacing it atomically.
+
+        The file can be picked up by a textfile collector of a local scraper.
+
+        Args:
+            path (str): The path of the file.
+
+        """
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as text_file:
+            text_file.write(self.export_text())
+        os.replace(temporary_path, path)
@@ -1,7 +1,7 @@
 import random
 
 from abc import ABC, abstractmethod
-from card import Card
+from hand import HandState
 
 
 class Player(ABC):
@@ -10,6 +10,9 @@ class Player(ABC):
     A player can be a human player, a computer player, or dealer. They
     have a common behavior of making decision(stand or hit) in their turn.
 
+    The value of the player's hands is tracked incrementally by a
+    HandState. The score and the bust status are read from it.
+
     """
 
     @abstractmethod
@@ -42,83 +45,51 @@ class Player(ABC):
                "\nBust Status: " + status_string + \
                "\n======================\n"
 
-    def initiate_score(self):
-        """Calculates the player's initial score and updates the player's score attribute.
-
-        Calculates the player's score after the dealing(before
-        the players' turn starts) and updates the initial score
-        to the player's score attribute.
+    @property
+    def score(self):
+        """int: The player's score, i.e. the best total of their hands."""
+        return self.hand.total
 
-        Logic of calculating the initial score:
+    @property
+    def is_bust(self):
+        """bool: True if the player busts, False otherwise."""
+        return self.hand.is_bust
 
-        The initial score is an optimal score, i.e. the maximum
-        score that is <= 21. After the dealing, each player has
-        two cards, which contains the following three cases:
+    def reset(self):
+        """Clears the player's hands, score and bust status for a new round.
 
-        Case #1: The two cards are both 'A'.
-        The optimal score is 12 by letting one 'A' scoring 1 and
-        the other 'A' scoring 11. The two 'A's can not both score
-        11 because otherwise the total score would be 22, which
-        exceeds 21 and triggers a bust. The two 'A's can not both
-        score 1 because otherwise the total score would be 2, which
-        is lower than 12.
-
-        Case #2: The two cards contain only one 'A'.
-        Let the single 'A' score 11 to achieve the optimal score. This
-        will never trigger a bust because the possible maximum score
-        of the other card is 10, however 10 + 11 = 21, which does not
-        exceed 21 and thus will not trigger a bust.
-
-        Case #3: The two cards contain no 'A'.
-        Use the static method Card.rank_to_score_except_ace(rank) to
-        get the score of each rank and then calculates the sum.
+        The HandState is reset in place; it is only created on the first
+        reset. The list of cards is a new one, since the outcome of the
+        previous round may still hold the old one.
 
         """
-        current_ranks = [current_card.rank for current_card in self.hands]
+        self.hands = []
+        try:
+            self.hand.reset()
+        except AttributeError:
+            self.hand = HandState()
 
-        if current_ranks == ['A', 'A']:
-            self.score = 12
-            return
+    def initiate_score(self):
+        """Calculates the player's initial score from the two dealt cards.
 
-        initial_score = 0
-        for rank in current_ranks:
-            if rank == 'A':
-                initial_score += 11
-                continue
-            initial_score += Card.rank_to_score_except_ace(rank)
+        Both cards are added to the player's HandState. An 'A' is scored
+        as 11 unless that would exceed 21, so two 'A's score 12.
 
-        self.score = initial_score
+        """
+        hand = self.hand
+        hand.reset()
+        for card in self.hands:
+            hand.add(card)
 
     def update_score(self):
-        """Updates player's score attribute after they hits.
-
-        After a player chooses 'hit', they gets a new card. This function
-        calculates the latest score after getting the new card and updates
-        the player's score attribute.
-
-        Logic of calculating the updated score:
+        """Updates player's score after they hits.
 
-        Case #1: The new card has a rank of 'A'.
-        To optimize the total score, first we try to score the new 'A'
-        as 11 and adds it to the current score, if the new score exceeds
-        21 (bust), then the new 'A' can only be scored as 1, otherwise
-        the new 'A' is scored as 11 to maximize the score.
-
-        Case #2: The new card does not have a rank of 'A'.
-        Use the static method Card.rank_to_score_except_ace(rank) to
-        get the score of the new card's rank, add it to the current
-        score and thus get a new score.
+        The new card is added to the player's HandState in O(1). An 'A'
+        counted as 11 is counted back down to 1 when a later card would
+        otherwise make the hand bust.
 
         """
-        new_card = self.hands[-1]
-
-        if new_card.rank == 'A':
-            if self.score + 11 <= 21:
-                self.score += 11
-                return
-            self.score += 1
-        else:
-            self.score += Card.rank_to_score_except_ace(new_card.rank)
+        self.hand.add(self.hands[-1])
 
 
 class HumanPlayer(Player):
@@ -127,6 +98,7 @@ class HumanPlayer(Player):
     Attributes:
         player_name (str): The name of the player.
         hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
         is_bust (bool): True if the player busts, False otherwise.
         score (int): The player's score.
 
@@ -140,17 +112,19 @@ class HumanPlayer(Player):
                 from 1. The serial number is unique among human players.
         """
         self.player_name = "Human Player " + str(player_number)
-        self.hands = []
-        self.is_bust = False
-        self.score = 0
+        self.reset()
 
-    def get_decision(self):
+    def get_decision(self, dealer_upcard=None):
         """Gets the human player's decision of 'hit' or 'stand' in their turn.
 
         When it is the human player's turn, this function interactively
         prompts the human player to enter a code to indicate their decision
         (1-hit, 2-stand).
 
+        Args:
+            dealer_upcard (:obj:`Card`, optional): The dealer's face-up card.
+                Not used, since the human player sees the game state.
+
         Returns:
             int: A code of decision, 1 for 'hit', 2 for 'stand'.
 
@@ -177,29 +151,38 @@ class ComputerPlayer(Player):
     Attributes:
         player_name (str): The name of the player.
         hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
         is_bust (bool): True if the player busts, False otherwise.
         score (int): The player's score.
+        rng (:obj:`random.Random`): The random number generator used to decide.
 
     """
-    def __init__(self, player_number):
+    def __init__(self, player_number, rng=None):
         """Constructs an instance of a ComputerPlayer.
 
         Args:
             player_number (int): The serial number of the player, starting
                 from 1. The serial number is unique among computer players.
+            rng (:obj:`random.Random`, optional): The random number generator
+                used to decide. The global `random` module is used if not given.
         """
         self.player_name = "Computer Player " + str(player_number)
-        self.hands = []
-        self.is_bust = False
-        self.score = 0
+        self.rng = random if rng is None else rng
+        self.reset()
 
-    def get_decision(self):
+    def get_decision(self, dealer_upcard=None):
         """Gets the computer player's decision of 'hit' or 'stand' in their turn.
 
-        The computer player randomly choose between 1 and 2 (1-hit, 2-stand).
+        The computer player randomly choose between 1 and 2 (1-hit, 2-stand)
+        with equal chance. A single random float is drawn, which is much
+        cheaper than random.randint(1, 2).
+
+        Args:
+            dealer_upcard (:obj:`Card`, optional): The dealer's face-up card.
+                Not used by the random choice; subclasses may use it.
 
         Returns:
             int: A code of decision, 1 for 'hit', 2 for 'stand'.
 
         """
-        return random.randint(1, 2)
\ No newline at end of file
+        return 1 if self.rng.random() < 0.5 else 2
\ No newline at end of file
@@ -0,0 +1,308 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from card import CARDS
+from deck import HI_LO_TAGS
+from player import ComputerPlayer
+from strategy import DecisionTable, StrategyComputerPlayer
+
+# A card of each value, indexed by value from 1 ('A') to 10, to show an
+# upcard value to a scalar policy.
+_UPCARDS = (None,) + tuple(next(card for card in CARDS if card.value == value) for value in range(1, 11))
+
+
+class DecisionStates:
+    """A batch of decision states, one per hand waiting for a decision.
+
+    Every attribute is an array with one entry per hand.
+
+    Attributes:
+        totals (:obj:`numpy.ndarray`): The score of each hand.
+        is_soft (:obj:`numpy.ndarray`): True for the soft hands.
+        upcards (:obj:`numpy.ndarray`): The value of the dealer's face-up
+            card, from 1 ('A') to 10.
+        cards_left (:obj:`numpy.ndarray`): The number of cards left to deal
+            in the shoe.
+        running_counts (:obj:`numpy.ndarray`): The Hi-Lo running count of
+            the cards seen, the dealer's face-down card excluded.
+
+    """
+    __slots__ = ('totals', 'is_soft', 'upcards', 'cards_left', 'running_counts')
+
+    def __init__(self, totals, is_soft, upcards, cards_left, running_counts):
+        """Constructs an instance of DecisionStates.
+
+        Args:
+            totals (:obj:`numpy.ndarray`): The score of each hand.
+            is_soft (:obj:`numpy.ndarray`): True for the soft hands.
+            upcards (:obj:`numpy.ndarray`): The value of each dealer's upcard.
+            cards_left (:obj:`numpy.ndarray`): The number of cards left in each shoe.
+            running_counts (:obj:`numpy.ndarray`): The running count of each shoe.
+
+        """
+        self.totals = totals
+        self.is_soft = is_soft
+        self.upcards = upcards
+        self.cards_left = cards_left
+        self.running_counts = running_counts
+
+    def __len__(self):
+        """Gets the number of decision states.
+
+        Returns:
+            int: The number of hands in the batch.
+
+        """
+        return len(self.totals)
+
+    def true_counts(self):
+        """Gets the running counts per deck left to deal, as Deck.true_count does.
+
+        Returns:
+            :obj:`numpy.ndarray`: The true count of each shoe, 0 for an empty shoe.
+
+        """
+        cards_left = np.maximum(self.cards_left, 1)
+        return np.where(self.cards_left > 0, self.running_counts * 52 / cards_left, 0.0)
+
+
+class BatchPolicy(ABC):
+    """A policy that decides a whole batch of hands at once.
+
+    Subclasses implement decide. A policy is called once per batch, so a
+    vectorized or learned policy pays the cost of a call once for many
+    hands instead of once per card.
+
+    """
+
+    @abstractmethod
+    def decide(self, states):
+        """Gets the decision of every hand of a batch.
+
+        Args:
+            states (:obj:`DecisionStates`): The decision states.
+
+        Returns:
+            :obj:`numpy.ndarray`: A code of decision per hand, 1 for 'hit',
+                2 for 'stand'.
+
+        """
+        pass
+
+
+class RandomPolicy(BatchPolicy):
+    """Hits or stands at random, as ComputerPlayer does.
+
+    Attributes:
+        rng (:obj:`numpy.random.Generator`): The random number generator.
+        hit_probability (float): The probability of hitting.
+
+    """
+
+    def __init__(self, rng=None, hit_probability=0.5):
+        """Constructs an instance of RandomPolicy.
+
+        Args:
+            rng (:obj:`numpy.random.Generator`, optional): The random number
+                generator. A new, unseeded one is used if not given.
+            hit_probability (float): The probability of hitting (default to be 0.5).
+
+        """
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.hit_probability = hit_probability
+
+    def decide(self, states):
+        """Draws one random float per hand.
+
+        Args:
+            states (:obj:`DecisionStates`): The decision states.
+
+        Returns:
+            :obj:`numpy.ndarray`: A code of decision per hand.
+
+        """
+        return 2 - (self.rng.random(len(states)) < self.hit_probability).view(np.uint8)
+
+
+class TablePolicy(BatchPolicy):
+    """Follows a decision table, with one array lookup per batch.
+
+    Attributes:
+        decisions (:obj:`numpy.ndarray`): The decision codes of the table,
+            see DecisionTable.
+
+    """
+
+    def __init__(self, table):
+        """Constructs an instance of TablePolicy.
+
+        Args:
+            table (:obj:`DecisionTable`): The decision table.
+
+        """
+        self.decisions = np.frombuffer(table.decisions, dtype=np.uint8)
+
+    def decide(self, states):
+        """Looks every hand up in the table.
+
+        Args:
+            states (:obj:`DecisionStates`): The decision states.
+
+        Returns:
+            :obj:`numpy.ndarray`: A code of decision per hand.
+
+        """
+        totals = states.totals.astype(np.intp)
+        return self.decisions[(totals * 2 + states.is_soft) * 11 + states.upcards]
+
+
+class ScalarPolicyAdapter(BatchPolicy):
+    """Lets a player who decides one hand at a time decide a batch.
+
+    The player is asked once per hand, with their HandState set to the
+    total and softness of the hand and a card of the upcard's value. This
+    suits players who decide from their hand and the upcard only, e.g.
+    ComputerPlayer and StrategyComputerPlayer, not players who look at the
+    table, such as LookaheadComputerPlayer.
+
+    Attributes:
+        player (:obj:`ComputerPlayer`): The player, used for their decisions only.
+
+    """
+
+    def __init__(self, player):
+        """Constructs an instance of ScalarPolicyAdapter.
+
+        Args:
+            player (:obj:`ComputerPlayer`): The player. Their hand is overwritten.
+
+        """
+        self.player = player
+
+    def decide(self, states):
+        """Asks the player once per hand.
+
+        Args:
+            states (:obj:`DecisionStates`): The decision states.
+
+        Returns:
+            :obj:`numpy.ndarray`: A code of decision per hand.
+
+        """
+        player = self.player
+        hand = player.hand
+        decisions = np.empty(len(states), dtype=np.uint8)
+        for index, (total, is_soft, upcard_value) in enumerate(zip(states.totals.tolist(), states.is_soft.tolist(),
+                                                                   states.upcards.tolist())):
+            hand.total = total
+            hand.is_soft = is_soft
+            decisions[index] = player.get_decision(_UPCARDS[upcard_value])
+        return decisions
+
+
+def as_batch_policy(policy, rules=None):
+    """Converts a policy to a batch policy.
+
+    Args:
+        policy: A BatchPolicy, a DecisionTable, a StrategyComputerPlayer
+            (whose table is followed), a BatchPolicyPlayer (whose policy
+            is followed) or any other ComputerPlayer who decides from their
+            hand and the upcard only (who is asked once per hand, see
+            ScalarPolicyAdapter).
+        rules (:obj:`Rules`, optional): The rules the policy plays under.
+            A decision table must suit them, see DecisionTable.suits. A
+            StrategyComputerPlayer who follows the basic strategy switches
+            to that of the rules. Tables are not checked if not given.
+
+    Returns:
+        :obj:`BatchPolicy`: The batch policy.
+
+    Raises:
+        ValueError: If the policy is of none of these kinds, e.g. a
+            player who looks at the table, such as LookaheadComputerPlayer,
+            or a human player, or if its decision table does not suit the
+            rules.
+
+    """
+    if isinstance(policy, BatchPolicyPlayer):
+        policy = policy.policy
+    if isinstance(policy, BatchPolicy):
+        return policy
+    if isinstance(policy, StrategyComputerPlayer):
+        if rules is not None:
+            policy.follow_rules(rules)
+        policy = DecisionTable(0, policy.decisions, policy.table_rules)
+    if isinstance(policy, DecisionTable):
+        if rules is not None and not policy.suits(rules):
+            raise ValueError("The decision table was solved for {!r}, not for {!r}!".format(policy.rules, rules))
+        return TablePolicy(policy)
+    if isinstance(policy, ComputerPlayer) and not hasattr(policy, 'sit_at'):
+        return ScalarPolicyAdapter(policy)
+    raise ValueError("Unknown policy: {!r}".format(policy))
+
+
+class BatchPolicyPlayer(ComputerPlayer):
+    """A computer player who follows a batch policy, one hand at a time.
+
+    Lets a batch policy sit at a Game or an Engine. Each decision is a
+    batch of one hand; the shoe summary is read from the table the player
+    sits at, and is empty if the player is not seated.
+
+    Attributes:
+        player_name (str): The name of the player.
+        hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
+        is_bust (bool): True if the player busts, False otherwise.
+        score (int): The player's score.
+        rng (:obj:`random.Random`): The random number generator, unused.
+        policy (:obj:`BatchPolicy`): The policy followed.
+        table (:obj:`Game` or :obj:`Engine`): The table the player sits at.
+
+    """
+
+    def __init__(self, player_number, policy, rng=None):
+        """Constructs an instance of BatchPolicyPlayer.
+
+        Args:
+            player_number (int): The serial number of the player, starting
+                from 1. The serial number is unique among computer players.
+            policy: The policy followed, see as_batch_policy.
+            rng (:obj:`random.Random`, optional): Not used by the decisions.
+        """
+        super().__init__(player_number, rng)
+        self.policy = as_batch_policy(policy)
+        self.table = None
+
+    def sit_at(self, table):
+        """Seats the player at a table, whose shoe the player summarizes.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): A table the player is one
+                of the players of.
+
+        """
+        self.table = table
+
+    def get_decision(self, dealer_upcard):
+        """Gets the decision of the policy for the player's hand.
+
+        Args:
+            dealer_upcard (:obj:`Card`): The dealer's face-up card.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        """
+        cards_left = running_count = 0
+        if self.table is not None:
+            dealer = self.table.dealer
+            deck = dealer.deck
+            cards_left = len(deck)
+            running_count = deck.running_count
+            if len(dealer.hands) > 1 and not dealer.is_dealer_turn_started:
+                running_count -= HI_LO_TAGS[dealer.hands[1].value]
+        hand = self.hand
+        states = DecisionStates(np.array([hand.total]), np.array([hand.is_soft]), np.array([dealer_upcard.value]),
+                                np.array([cards_left]), np.array([running_count]))
+        return int(self.policy.decide(states)[0])
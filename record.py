@@ -0,0 +1,93 @@
+import json
+
+
+class RoundRecord:
+    """The compact record of a round, enough to replay it exactly.
+
+    A recorded round is dealt from a shoe shuffled from the round's own
+    seed, so the seed fixes every card. The only other input of a round
+    is the players' decisions. Since a player's turn is a run of hits
+    ended by a stand or a bust, the decisions of a seat come down to its
+    number of hits.
+
+    Attributes:
+        seed (int): The seed the shoe was shuffled from.
+        num_decks (int): The number of decks in the shoe.
+        hits (:obj:`list` of int): The number of hits of each seat, the
+            dealer excluded.
+        scores (:obj:`list` of int): The final score of each seat, the
+            dealer being the last one. A score > 21 is a bust.
+
+    """
+    __slots__ = ('seed', 'num_decks', 'hits', 'scores')
+
+    def __init__(self, seed, num_decks, hits, scores):
+        """Constructs an instance of RoundRecord.
+
+        Args:
+            seed (int): The seed the shoe was shuffled from.
+            num_decks (int): The number of decks in the shoe.
+            hits (:obj:`list` of int): The number of hits of each seat.
+            scores (:obj:`list` of int): The final score of each seat and
+                of the dealer.
+
+        """
+        self.seed = seed
+        self.num_decks = num_decks
+        self.hits = hits
+        self.scores = scores
+
+    def __eq__(self, other):
+        """Checks whether two records are the same.
+
+        Args:
+            other (:obj:`RoundRecord`): The record to compare with.
+
+        Returns:
+            bool: True if both records hold the same values, False otherwise.
+
+        """
+        if not isinstance(other, RoundRecord):
+            return NotImplemented
+        return (self.seed == other.seed and self.num_decks == other.num_decks
+                and list(self.hits) == list(other.hits) and list(self.scores) == list(other.scores))
+
+    def __repr__(self):
+        """Represents the record as string.
+
+        Returns:
+            str: The string representation of the record.
+
+        """
+        return "RoundRecord(seed={}, num_decks={}, hits={}, scores={})".format(
+            self.seed, self.num_decks, list(self.hits), list(self.scores))
+
+
+def save_records(path, records):
+    """Writes records to a log file, one JSON array per line.
+
+    Args:
+        path (str): The path of the log file.
+        records (iterable of :obj:`RoundRecord`): The records to write.
+
+    """
+    with open(path, 'w') as log_file:
+        for record in records:
+            log_file.write(json.dumps([record.seed, record.num_decks, list(record.hits), list(record.scores)]))
+            log_file.write("\n")
+
+
+def load_records(path):
+    """Reads the records of a log file written by save_records.
+
+    Args:
+        path (str): The path of the log file.
+
+    Yields:
+        :obj:`RoundRecord`: Each record, in the order of the file.
+
+    """
+    with open(path) as log_file:
+        for line in log_file:
+            if line.strip():
+                yield RoundRecord(*json.loads(line))
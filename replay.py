@@ -0,0 +1,133 @@
+from engine import Engine
+from player import Player
+from rules import Rules
+
+
+class ReplayPlayer(Player):
+    """A player who repeats the decisions of a recorded round.
+
+    Attributes:
+        player_name (str): The name of the player.
+        hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
+        is_bust (bool): True if the player busts, False otherwise.
+        score (int): The player's score.
+        hits_left (int): The number of hits the player still takes in the
+            round.
+
+    """
+
+    def __init__(self, seat_number):
+        """Constructs an instance of ReplayPlayer.
+
+        Args:
+            seat_number (int): The serial number of the seat, starting from 1.
+
+        """
+        self.player_name = "Seat " + str(seat_number)
+        self.hits_left = 0
+        self.reset()
+
+    def get_decision(self, dealer_upcard=None):
+        """Hits as many times as recorded, then stands.
+
+        Args:
+            dealer_upcard (:obj:`Card`): The dealer's face-up card, unused.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        """
+        if self.hits_left > 0:
+            self.hits_left -= 1
+            return 1
+        return 2
+
+
+class Replayer:
+    """Replays recorded rounds without any input or output.
+
+    A round is replayed by the headless engine, with players who repeat
+    the recorded decisions, from a shoe shuffled from the recorded seed.
+    Nothing but the rules is shared with the table the round was played
+    at, so a round played by human players replays the same as a
+    simulated one. A record does not hold the rules: rounds played under
+    other rules than those of the original game must be replayed by a
+    Replayer given the same rules. One engine is kept per table size and
+    number of decks, so replaying many rounds creates no new table.
+
+    Attributes:
+        rules (:obj:`Rules`): The rules the rounds were played under, None
+            for those of the original game.
+
+    """
+
+    def __init__(self, rules=None):
+        """Constructs an instance of Replayer.
+
+        Args:
+            rules (:obj:`Rules`, optional): The rules the rounds were
+                played under. The number of decks is taken from each
+                record.
+
+        """
+        self.rules = rules
+        self._engines = {}
+
+    def _engine(self, num_seats, num_decks):
+        """Gets the engine of a table, creating it on first use.
+
+        Args:
+            num_seats (int): The number of players, the dealer excluded.
+            num_decks (int): The number of decks in the shoe.
+
+        Returns:
+            :obj:`Engine`: The engine of the table.
+
+        """
+        key = (num_seats, num_decks)
+        engine = self._engines.get(key)
+        if engine is None:
+            rules = None
+            if self.rules is not None:
+                rules = Rules(num_decks, self.rules.dealer_hits_soft_17, self.rules.blackjack_beats_21,
+                              self.rules.ties)
+            engine = Engine(players=[ReplayPlayer(_) for _ in range(1, num_seats + 1)],
+                            num_decks=num_decks, penetration=0.0, rules=rules)
+            self._engines[key] = engine
+        return engine
+
+    def replay(self, record):
+        """Replays a recorded round.
+
+        Args:
+            record (:obj:`RoundRecord`): The record of the round.
+
+        Returns:
+            :obj:`RoundResult`: The outcome of the round, with every card
+                dealt. The players are named after their seats.
+
+        """
+        engine = self._engine(len(record.hits), record.num_decks)
+        for player, num_hits in zip(engine.all_players, record.hits):
+            player.hits_left = num_hits
+        return engine.play_round(record.seed)
+
+    def verify(self, records):
+        """Replays many recorded rounds and checks their final scores.
+
+        Args:
+            records (iterable of :obj:`RoundRecord`): The records, e.g.
+                read from an archived log.
+
+        Returns:
+            :obj:`list` of int: The positions of the records whose replayed
+                scores differ from the recorded ones. Empty if every round
+                replays as recorded.
+
+        """
+        mismatches = []
+        for position, record in enumerate(records):
+            if self.replay(record).scores != list(record.scores):
+                mismatches.append(position)
+        return mismatches
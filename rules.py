@@ -0,0 +1,248 @@
+from functools import lru_cache
+
+# The tie rules: every player with the highest score wins, the dealer
+# alone wins a tie they are part of, or a tie has no winner.
+TIES_SHARED = 'shared'
+TIES_TO_DEALER = 'dealer'
+TIES_PUSH = 'push'
+TIE_RULES = (TIES_SHARED, TIES_TO_DEALER, TIES_PUSH)
+
+# The highest hard total a hand can reach: 21 plus a 10-valued card.
+MAX_HARD_TOTAL = 31
+
+# A hand state is hard_total * 2 + has_ace, i.e. the hard total with every
+# 'A' counted as 1 and whether the hand holds an 'A'. Nothing else is
+# needed to score a hand, see HandState.
+NUM_STATES = (MAX_HARD_TOTAL + 1) * 2
+
+
+def _state_tables():
+    """Builds the hand state tables, which no option changes.
+
+    Returns:
+        tuple: The next state of each state and card value, indexed by
+            state * 11 + value, and the score and the softness of each state.
+
+    """
+    next_state = [0] * (NUM_STATES * 11)
+    state_totals = [0] * NUM_STATES
+    state_soft = [False] * NUM_STATES
+    for hard_total in range(MAX_HARD_TOTAL + 1):
+        for has_ace in (0, 1):
+            state = hard_total * 2 + has_ace
+            is_soft = bool(has_ace) and hard_total <= 11
+            state_totals[state] = hard_total + 10 if is_soft else hard_total
+            state_soft[state] = is_soft
+            for value in range(1, 11):
+                # A busted hand takes no more card: its state is kept.
+                if hard_total > 21:
+                    next_state[state * 11 + value] = state
+                else:
+                    next_state[state * 11 + value] = (hard_total + value) * 2 + (has_ace or value == 1)
+    return tuple(next_state), tuple(state_totals), tuple(state_soft)
+
+
+NEXT_STATE, STATE_TOTALS, STATE_SOFT = _state_tables()
+
+
+@lru_cache(maxsize=None)
+def _option_tables(dealer_hits_soft_17, blackjack_beats_21):
+    """Builds the dealer and ranking tables of a set of options.
+
+    The tables are shared by every Rules with the same options.
+
+    Args:
+        dealer_hits_soft_17 (bool): True if the dealer hits a soft 17.
+        blackjack_beats_21 (bool): True if a natural blackjack beats 21.
+
+    Returns:
+        tuple: The dealer table, indexed by [is_soft][total], and the
+            ranking table, indexed by [is_blackjack][total].
+
+    """
+    totals = range(MAX_HARD_TOTAL + 1)
+    dealer_hits = (tuple(total < 17 for total in totals),
+                   tuple(total < 17 or (total == 17 and dealer_hits_soft_17) for total in totals))
+    ranks = (tuple(total if total <= 21 else 0 for total in totals),
+             tuple(22 if total == 21 and blackjack_beats_21 else total if total <= 21 else 0 for total in totals))
+    return dealer_hits, ranks
+
+
+def _break_shared(winners, dealer):
+    """Keeps every player who shares the highest score."""
+    return winners
+
+
+def _break_to_dealer(winners, dealer):
+    """Gives a tie to the dealer if they are part of it."""
+    return [dealer] if winners[-1] is dealer else winners
+
+
+def _break_push(winners, dealer):
+    """Leaves a tie without any winner."""
+    return []
+
+
+_TIE_BREAKERS = {TIES_SHARED: _break_shared, TIES_TO_DEALER: _break_to_dealer, TIES_PUSH: _break_push}
+
+
+class Rules:
+    """The rules of a table, compiled into lookup tables.
+
+    The options are only read when the rules are constructed. Each one is
+    folded into a table, so the engines look the outcome of a rule up
+    instead of testing the options, and a new option adds no cost per card:
+
+    * next_state maps a hand state (see NUM_STATES) and a card value to the
+      next hand state; state_totals and state_soft give the score and the
+      softness of each state.
+    * dealer_hits tells whether the dealer hits, indexed by
+      [is_soft][total].
+    * ranks gives the rank of a final hand, indexed by
+      [is_blackjack][total]: 0 for a bust, the score otherwise, and 22 for
+      a natural blackjack if it beats 21.
+
+    The tables are plain tuples, shared by the rules with the same options,
+    and must not be changed; the rules of a table are changed by
+    constructing new Rules.
+
+    Attributes:
+        num_decks (int): The number of decks in the shoe.
+        dealer_hits_soft_17 (bool): True if the dealer hits a soft 17.
+        blackjack_beats_21 (bool): True if a natural blackjack beats a 21
+            of three cards or more.
+        ties (str): The tie rule, one of TIE_RULES.
+        next_state (tuple): The next hand state, indexed by state * 11 + value.
+        state_totals (tuple): The score of each hand state.
+        state_soft (tuple): True for the soft hand states.
+        dealer_hits (tuple): True where the dealer hits, indexed by
+            [is_soft][total].
+        ranks (tuple): The rank of a final hand, indexed by
+            [is_blackjack][total].
+
+    """
+
+    def __init__(self, num_decks=1, dealer_hits_soft_17=False, blackjack_beats_21=False, ties=TIES_SHARED):
+        """Constructs an instance of Rules and compiles its tables.
+
+        The defaults are the rules of the original game.
+
+        Args:
+            num_decks (int): The number of decks in the shoe (default to be 1).
+            dealer_hits_soft_17 (bool): True if the dealer hits a soft 17
+                (default to be False, i.e. the dealer stands on every 17).
+            blackjack_beats_21 (bool): True if a natural blackjack beats a
+                21 of three cards or more (default to be False).
+            ties (str): The tie rule, one of TIE_RULES (default to be
+                TIES_SHARED, i.e. every player with the highest score wins).
+
+        Raises:
+            ValueError: If `num_decks` < 1 or the tie rule is unknown.
+
+        """
+        if num_decks < 1:
+            raise ValueError("The shoe must have at least one deck!")
+        if ties not in _TIE_BREAKERS:
+            raise ValueError("Unknown tie rule: {!r}".format(ties))
+
+        self.num_decks = num_decks
+        self.dealer_hits_soft_17 = dealer_hits_soft_17
+        self.blackjack_beats_21 = blackjack_beats_21
+        self.ties = ties
+        self._break_tie = _TIE_BREAKERS[ties]
+        self.next_state = NEXT_STATE
+        self.state_totals = STATE_TOTALS
+        self.state_soft = STATE_SOFT
+        self.dealer_hits, self.ranks = _option_tables(bool(dealer_hits_soft_17), bool(blackjack_beats_21))
+
+    def dealer_must_hit(self, hand):
+        """Checks whether the dealer has to hit a hand.
+
+        Args:
+            hand (:obj:`HandState`): The dealer's hand.
+
+        Returns:
+            bool: True if the dealer hits, False if they stand.
+
+        """
+        return self.dealer_hits[hand.is_soft][hand.total]
+
+    def rank(self, hand):
+        """Gets the rank of a final hand. Higher ranks beat lower ones.
+
+        Args:
+            hand (:obj:`HandState`): The hand.
+
+        Returns:
+            int: 0 for a bust, the rank of the hand otherwise.
+
+        """
+        return self.ranks[hand.is_blackjack][hand.total]
+
+    def find_winners(self, players):
+        """Finds the winners among the given players without any output.
+
+        Players who bust are excluded. The remaining players with the
+        highest rank are the winners, and ties follow the tie rule. If
+        everyone busts, there is no winner and the returned list is empty.
+
+        Args:
+            players (:obj:`list` of :obj:`Player`): The players of a round,
+                the dealer being the last one.
+
+        Returns:
+            :obj:`list` of :obj:`Player`: The winners, in seating order.
+
+        """
+        ranks = self.ranks
+        best_rank = 0
+        winners = []
+        for player in players:
+            hand = player.hand
+            rank = ranks[hand.is_blackjack][hand.total]
+            if rank >= best_rank:
+                if rank > best_rank:
+                    best_rank = rank
+                    winners = [player]
+                elif rank:
+                    winners.append(player)
+        if len(winners) > 1:
+            return self._break_tie(winners, players[-1])
+        return winners
+
+    def __repr__(self):
+        """Represents the rules as string.
+
+        Returns:
+            str: The options of the rules.
+
+        """
+        return "Rules(num_decks={}, dealer_hits_soft_17={}, blackjack_beats_21={}, ties={!r})".format(
+            self.num_decks, self.dealer_hits_soft_17, self.blackjack_beats_21, self.ties)
+
+
+# The rules of the original game.
+DEFAULT_RULES = Rules()
+
+
+def resolve_rules(num_decks=None, rules=None):
+    """Gets the rules of a table from a number of decks and optional rules.
+
+    Args:
+        num_decks (int, optional): The number of decks in the shoe.
+        rules (:obj:`Rules`, optional): The rules of the table.
+
+    Returns:
+        :obj:`Rules`: `rules` if given, the rules of the original game
+            with `num_decks` decks (1 if not given) otherwise.
+
+    Raises:
+        ValueError: If both are given and `num_decks` is not the number of
+            decks of the rules.
+
+    """
+    if rules is None:
+        return Rules(1 if num_decks is None else num_decks)
+    if num_decks is not None and num_decks != rules.num_decks:
+        raise ValueError("The table has {} decks but its rules have {}!".format(num_decks, rules.num_decks))
+    return rules
@@ -0,0 +1,326 @@
+"""An asyncio server hosting many blackjack tables in one process.
+
+Usage:
+    python server.py [--host HOST] [--port PORT | --unix PATH] [--timeout SECONDS]
+    python server.py --demo NUM_CLIENTS [--rounds NUM_ROUNDS]
+
+Every connection gets its own table, with one human player and the given
+number of computer players. The server and the client exchange JSON lines.
+The server sends the events of the game (see JsonLinesSink), the dealer's
+face-down card hidden until it is revealed, and two kinds of prompts:
+    {"event": "decision", "player": ..., "score": ..., "upcard": ...}
+    {"event": "new_round"}
+The client answers each prompt with a line holding 1 or 2, as at the
+console (1-hit, 2-stand; 1-yes, 2-no). A decision that does not arrive
+within the timeout counts as 'stand', however many invalid lines the
+client sends meanwhile; an unanswered new-round prompt ends the session.
+"""
+import argparse
+import asyncio
+import json
+
+from events import JsonLinesSink
+from game import Game
+from player import HumanPlayer
+from rules import resolve_rules
+
+
+class _WriterStream:
+    """A text stream that writes into an asyncio StreamWriter.
+
+    The writer buffers the bytes; they are sent when the table awaits
+    StreamWriter.drain.
+
+    """
+
+    def __init__(self, writer):
+        """Constructs an instance of _WriterStream.
+
+        Args:
+            writer (:obj:`asyncio.StreamWriter`): The writer of the connection.
+
+        """
+        self._writer = writer
+
+    def write(self, text):
+        """Writes text to the connection.
+
+        Args:
+            text (str): The text to write.
+
+        """
+        self._writer.write(text.encode())
+
+    def flush(self):
+        """Does nothing: the table drains the writer when it waits anyway."""
+        pass
+
+
+class TableServer:
+    """A server running concurrent tables, each driven by a remote human player.
+
+    Computer players and the dealer play synchronously, without yielding
+    to the event loop. A table only yields while it waits for its human
+    player, so hundreds of tables share one thread.
+
+    Attributes:
+        num_computer_player (int): The number of computer players per table.
+        decision_timeout (float): The seconds a human player has to decide.
+        num_decks (int): The number of decks in each table's shoe.
+        penetration (float): The fraction of the shoe dealt before reshuffling.
+        rules (:obj:`Rules`): The rules of every table.
+        open_tables (int): The number of tables currently open.
+        rounds_played (int): The number of rounds played on all tables.
+
+    """
+
+    def __init__(self, num_computer_player=1, decision_timeout=30.0, num_decks=None, penetration=0.0, rules=None):
+        """Constructs an instance of TableServer.
+
+        Args:
+            num_computer_player (int): The number of computer players per
+                table (default to be 1).
+            decision_timeout (float): The seconds a human player has to
+                decide before they stand (default to be 30).
+            num_decks (int, optional): The number of decks in each shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0, i.e. reshuffle every round).
+            rules (:obj:`Rules`, optional): The rules of every table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If there is no computer player, if `num_decks` is
+                not the number of decks of `rules`, or if the number of
+                cards required by the initial dealing exceeds the shoe.
+
+        """
+        self.rules = resolve_rules(num_decks, rules)
+        if num_computer_player < 1:
+            raise ValueError("The table must have at least one computer player!")
+        if (num_computer_player + 2) * 2 > 52 * self.rules.num_decks:
+            raise ValueError("Too many players and not enough card.")
+        self.num_computer_player = num_computer_player
+        self.decision_timeout = decision_timeout
+        self.num_decks = self.rules.num_decks
+        self.penetration = penetration
+        self.open_tables = 0
+        self.rounds_played = 0
+
+    async def start_tcp(self, host='127.0.0.1', port=0, backlog=1024):
+        """Starts listening on a local TCP port.
+
+        Args:
+            host (str): The address to listen on (default to be 127.0.0.1).
+            port (int): The port, 0 to pick a free one.
+            backlog (int): The number of connections that can wait to be
+                accepted (default to be 1024).
+
+        Returns:
+            :obj:`asyncio.Server`: The listening server.
+
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=backlog)
+
+    async def start_unix(self, path, backlog=1024):
+        """Starts listening on a Unix socket.
+
+        Args:
+            path (str): The path of the socket.
+            backlog (int): The number of connections that can wait to be
+                accepted (default to be 1024).
+
+        Returns:
+            :obj:`asyncio.Server`: The listening server.
+
+        """
+        return await asyncio.start_unix_server(self.handle_connection, path, backlog=backlog)
+
+    async def handle_connection(self, reader, writer):
+        """Runs a table for a new connection until the human player leaves.
+
+        Args:
+            reader (:obj:`asyncio.StreamReader`): The reader of the connection.
+            writer (:obj:`asyncio.StreamWriter`): The writer of the connection.
+
+        """
+        self.open_tables += 1
+        try:
+            game = Game(1, self.num_computer_player, penetration=self.penetration,
+                        sink=JsonLinesSink(_WriterStream(writer), hide_hole_card=True), rules=self.rules)
+            while True:
+                await self._play_round(game, reader, writer)
+                self.rounds_played += 1
+                if await self._ask(reader, writer, {"event": "new_round"}, None) != 1:
+                    break
+                game.start_new_round()
+        except (ConnectionError, EOFError):
+            pass
+        finally:
+            self.open_tables -= 1
+            writer.close()
+
+    async def _play_round(self, game, reader, writer):
+        """Plays a round of a table, as Game.play_round does.
+
+        Args:
+            game (:obj:`Game`): The game of the table.
+            reader (:obj:`asyncio.StreamReader`): The reader of the connection.
+            writer (:obj:`asyncio.StreamWriter`): The writer of the connection.
+
+        """
+        sink = game.sink
+        game.show_game_state()
+        sink.players_turn_start()
+        dealer_upcard = game.dealer.hands[0]
+        for player_index, player in enumerate(game.all_players[:-1]):
+            is_turn_over = player.hand.is_bust
+            while not is_turn_over:
+                if isinstance(player, HumanPlayer):
+                    sink.flush()
+                    prompt = {"event": "decision", "player": player.player_name,
+                              "score": player.score, "upcard": str(dealer_upcard)}
+                    decision_code = await self._ask(reader, writer, prompt, 2)
+                else:
+                    decision_code = player.get_decision(dealer_upcard)
+                is_turn_over = game.apply_decision(player_index, decision_code)
+        sink.players_turn_end()
+        game.dealer_turn()
+        game.show_game_state()
+        game.declare_result()
+        game.record_round()
+        sink.flush()
+        await writer.drain()
+
+    async def _ask(self, reader, writer, prompt, default):
+        """Sends a prompt and waits for a code of 1 or 2.
+
+        The timeout covers the whole prompt: invalid answers do not extend it.
+
+        Args:
+            reader (:obj:`asyncio.StreamReader`): The reader of the connection.
+            writer (:obj:`asyncio.StreamWriter`): The writer of the connection.
+            prompt (dict): The prompt to send.
+            default (int): The code used if no valid answer arrives in time.
+
+        Returns:
+            int: The code answered, or `default`.
+
+        Raises:
+            EOFError: If the connection is closed.
+
+        """
+        writer.write((json.dumps(prompt) + "\n").encode())
+        await writer.drain()
+        deadline = asyncio.get_running_loop().time() + self.decision_timeout
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return default
+                line = await asyncio.wait_for(reader.readline(), remaining)
+                if not line:
+                    raise EOFError("The connection is closed.")
+                try:
+                    code = int(line)
+                except ValueError:
+                    code = None
+                if code in (1, 2):
+                    return code
+                writer.write((json.dumps({"event": "error", "message": "Please enter 1 or 2."}) + "\n").encode())
+                await writer.drain()
+        except asyncio.TimeoutError:
+            return default
+
+
+async def scripted_client(connect, num_rounds, stand_on=17):
+    """Plays a number of rounds as a scripted human player.
+
+    The client hits below a score and stands otherwise.
+
+    Args:
+        connect (callable): A coroutine function opening a connection and
+            returning its reader and writer.
+        num_rounds (int): The number of rounds to play.
+        stand_on (int): The lowest score the client stands on (default to be 17).
+
+    Returns:
+        :obj:`list` of :obj:`list` of :obj:`str`: The winners of each round.
+
+    """
+    reader, writer = await connect()
+    winners = []
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message["event"] == "decision":
+                writer.write(b"1\n" if message["score"] < stand_on else b"2\n")
+            elif message["event"] == "result":
+                winners.append(message["winners"])
+            elif message["event"] == "new_round":
+                writer.write(b"1\n" if len(winners) < num_rounds else b"2\n")
+            await writer.drain()
+    finally:
+        writer.close()
+    return winners
+
+
+async def _demo(num_clients, num_rounds):
+    """Runs a server and many scripted clients in one process.
+
+    Args:
+        num_clients (int): The number of clients, i.e. of concurrent tables.
+        num_rounds (int): The number of rounds each client plays.
+
+    """
+    table_server = TableServer()
+    server = await table_server.start_tcp()
+    host, port = server.sockets[0].getsockname()[:2]
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await asyncio.gather(*(scripted_client(lambda: asyncio.open_connection(host, port), num_rounds)
+                                     for _ in range(num_clients)))
+    duration = loop.time() - start
+    server.close()
+    await server.wait_closed()
+    rounds = sum(len(winners) for winners in results)
+    print("{} tables played {} rounds in {:.2f}s ({:.0f} rounds/sec)".format(
+        num_clients, rounds, duration, rounds / duration))
+
+
+def main(argv=None):
+    """Runs the server, or the demo, from the command line."""
+    parser = argparse.ArgumentParser(description="Hosts many blackjack tables in one process.")
+    parser.add_argument('--host', default='127.0.0.1', help="The address to listen on.")
+    parser.add_argument('--port', type=int, default=8765, help="The TCP port to listen on.")
+    parser.add_argument('--unix', help="The path of a Unix socket to listen on instead.")
+    parser.add_argument('--timeout', type=float, default=30.0, help="The seconds a human player has to decide.")
+    parser.add_argument('--computer-players', type=int, default=1, help="The number of computer players per table.")
+    parser.add_argument('--demo', type=int, metavar='NUM_CLIENTS',
+                        help="Run scripted clients against a local server instead.")
+    parser.add_argument('--rounds', type=int, default=10, help="The number of rounds per demo client.")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        asyncio.run(_demo(args.demo, args.rounds))
+        return
+
+    async def serve():
+        """Serves until interrupted."""
+        table_server = TableServer(args.computer_players, args.timeout)
+        if args.unix:
+            server = await table_server.start_unix(args.unix)
+        else:
+            server = await table_server.start_tcp(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
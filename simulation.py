@@ -0,0 +1,224 @@
+import multiprocessing
+import os
+import random
+
+from engine import Engine
+from rules import resolve_rules
+
+
+class Statistics:
+    """Aggregate statistics of simulated rounds, per player.
+
+    Statistics of separate runs can be merged. Every count is a plain sum,
+    so the merged result does not depend on how the rounds were split.
+
+    Attributes:
+        player_names (:obj:`list` of :obj:`str`): The names of all players,
+            the dealer being the last one.
+        rounds (int): The number of rounds.
+        no_winner_rounds (int): The number of rounds in which everyone busts.
+        wins (:obj:`list` of int): The number of rounds each player wins alone.
+        ties (:obj:`list` of int): The number of rounds each player shares
+            the highest score with other players.
+        busts (:obj:`list` of int): The number of rounds each player busts.
+        score_totals (:obj:`list` of int): The sum of each player's final scores.
+        cards_drawn (:obj:`list` of int): The number of cards each player drew.
+
+    """
+
+    def __init__(self, player_names):
+        """Constructs an empty instance of Statistics.
+
+        Args:
+            player_names (:obj:`list` of :obj:`str`): The names of all players.
+
+        """
+        num_players = len(player_names)
+        self.player_names = list(player_names)
+        self.rounds = 0
+        self.no_winner_rounds = 0
+        self.wins = [0] * num_players
+        self.ties = [0] * num_players
+        self.busts = [0] * num_players
+        self.score_totals = [0] * num_players
+        self.cards_drawn = [0] * num_players
+
+    def add(self, result):
+        """Adds the outcome of one round.
+
+        Args:
+            result (:obj:`RoundResult`): The outcome of the round.
+
+        """
+        self.rounds += 1
+        for index in range(len(self.player_names)):
+            self.score_totals[index] += result.scores[index]
+            self.cards_drawn[index] += len(result.cards[index])
+            if result.busts[index]:
+                self.busts[index] += 1
+
+        winners = result.winners
+        if not winners:
+            self.no_winner_rounds += 1
+            return
+        counts = self.wins if len(winners) == 1 else self.ties
+        for winner in winners:
+            counts[self.player_names.index(winner)] += 1
+
+    def merge(self, other):
+        """Adds the counts of another instance of Statistics to this one.
+
+        Args:
+            other (:obj:`Statistics`): The statistics to merge, collected
+                at a table with the same players.
+
+        Raises:
+            ValueError: If the players of the two tables differ.
+
+        """
+        if other.player_names != self.player_names:
+            raise ValueError("Cannot merge statistics of different tables!")
+        self.rounds += other.rounds
+        self.no_winner_rounds += other.no_winner_rounds
+        for counts, other_counts in ((self.wins, other.wins), (self.ties, other.ties),
+                                     (self.busts, other.busts), (self.score_totals, other.score_totals),
+                                     (self.cards_drawn, other.cards_drawn)):
+            for index, count in enumerate(other_counts):
+                counts[index] += count
+
+    def __eq__(self, other):
+        """Checks whether two instances of Statistics hold the same counts.
+
+        Returns:
+            bool: True if all counts are equal, False otherwise.
+
+        """
+        return isinstance(other, Statistics) and vars(self) == vars(other)
+
+    def __str__(self):
+        """Represents an instance of Statistics as string.
+
+        Returns:
+            str: One line per player with their rates over all rounds.
+
+        """
+        rounds = max(self.rounds, 1)
+        lines = ["Rounds: {}, no winner: {:.4f}".format(self.rounds, self.no_winner_rounds / rounds)]
+        for index, name in enumerate(self.player_names):
+            lines.append("{}: win {:.4f}, tie {:.4f}, bust {:.4f}, average score {:.2f}".format(
+                name, self.wins[index] / rounds, self.ties[index] / rounds,
+                self.busts[index] / rounds, self.score_totals[index] / rounds))
+        return '\n'.join(lines)
+
+
+def _simulate_chunk(task):
+    """Simulates one chunk of rounds on a fresh table. Runs in a worker process.
+
+    Args:
+        task (tuple): The seed of the chunk, the number of rounds, the
+            number of computer players, the penetration and the rules.
+
+    Returns:
+        :obj:`Statistics`: The statistics of the chunk.
+
+    """
+    seed, num_rounds, num_computer_player, penetration, rules = task
+    engine = Engine(num_computer_player, penetration=penetration, seed=seed, rules=rules)
+    statistics = Statistics(engine.player_names)
+    for result in engine.play_rounds(num_rounds):
+        statistics.add(result)
+    return statistics
+
+
+class Simulation:
+    """A simulation of many rounds spread across a pool of worker processes.
+
+    The rounds are split into chunks of a fixed size. Each chunk is played
+    on its own table whose random number generator is seeded from the
+    master seed and the chunk's index, and the statistics of the chunks
+    are merged in chunk order. The split does not depend on the number of
+    workers, so a given master seed gives identical results with any
+    number of workers.
+
+    Attributes:
+        num_computer_player (int): The number of computer players per table.
+        num_decks (int): The number of decks in each shoe.
+        penetration (float): The fraction of the shoe dealt before reshuffling.
+        seed (int): The master seed.
+        chunk_size (int): The number of rounds per chunk.
+        rules (:obj:`Rules`): The rules of every table.
+
+    """
+
+    def __init__(self, num_computer_player=1, num_decks=None, penetration=0.75, seed=0, chunk_size=10000,
+                 rules=None):
+        """Constructs an instance of Simulation.
+
+        Args:
+            num_computer_player (int): The number of computer players per
+                table (default to be 1).
+            num_decks (int, optional): The number of decks in each shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0.75).
+            seed (int): The master seed (default to be 0).
+            chunk_size (int): The number of rounds per chunk (default to be 10000).
+            rules (:obj:`Rules`, optional): The rules of every table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If `num_decks` is not the number of decks of `rules`.
+
+        """
+        self.rules = resolve_rules(num_decks, rules)
+        self.num_computer_player = num_computer_player
+        self.num_decks = self.rules.num_decks
+        self.penetration = penetration
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def _tasks(self, num_rounds):
+        """Splits the rounds into chunks, each with its own derived seed.
+
+        Args:
+            num_rounds (int): The total number of rounds.
+
+        Returns:
+            :obj:`list` of tuple: The arguments of _simulate_chunk for each chunk.
+
+        """
+        seeds = random.Random(self.seed)
+        tasks = []
+        for start in range(0, num_rounds, self.chunk_size):
+            tasks.append((seeds.getrandbits(64), min(self.chunk_size, num_rounds - start),
+                          self.num_computer_player, self.penetration, self.rules))
+        return tasks
+
+    def run(self, num_rounds, num_workers=None):
+        """Simulates a number of rounds.
+
+        Args:
+            num_rounds (int): The total number of rounds.
+            num_workers (int, optional): The number of worker processes.
+                Defaults to the number of CPUs. With 1 worker, the rounds
+                are simulated in the current process.
+
+        Returns:
+            :obj:`Statistics`: The merged statistics of all rounds.
+
+        """
+        tasks = self._tasks(num_rounds)
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+
+        if num_workers == 1 or len(tasks) <= 1:
+            chunk_statistics = [_simulate_chunk(task) for task in tasks]
+        else:
+            with multiprocessing.Pool(min(num_workers, len(tasks))) as pool:
+                chunk_statistics = pool.map(_simulate_chunk, tasks)
+
+        statistics = Statistics(Engine(self.num_computer_player).player_names)
+        for chunk in chunk_statistics:
+            statistics.merge(chunk)
+        return statistics
@@ -0,0 +1,51 @@
+class TableSnapshot:
+    """The state of a table at some point of a round, to go back to it later.
+
+    A snapshot holds the state of the deck (see Deck.save_state), the
+    cards and the HandState values of every player, and whether the
+    dealer has revealed their face-down card. Cards are shared, never
+    copied, and the order of the shoe is shared by every snapshot taken
+    between two shuffles, so a snapshot costs a few small tuples and many
+    of them can be taken per decision. Works with any table that has a
+    dealer and all_players, i.e. Game and Engine.
+
+    Attributes:
+        deck_state (tuple): The saved state of the deck.
+        hands (tuple): The cards of each player, the dealer being the last one.
+        hand_states (tuple): The saved HandState values of each player.
+        is_dealer_turn_started (bool): True if the dealer's turn had started.
+        round_hits (tuple): The number of hits of each player in the round,
+            None if the table does not count them.
+
+    """
+    __slots__ = ('deck_state', 'hands', 'hand_states', 'is_dealer_turn_started', 'round_hits')
+
+    def __init__(self, table):
+        """Takes a snapshot of a table.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): The table.
+
+        """
+        dealer = table.dealer
+        players = table.all_players
+        self.deck_state = dealer.deck.save_state()
+        self.hands = tuple(tuple(player.hands) for player in players)
+        self.hand_states = tuple(player.hand.save() for player in players)
+        self.is_dealer_turn_started = dealer.is_dealer_turn_started
+        self.round_hits = None
+
+    def restore(self, table):
+        """Puts a table back in the state of the snapshot.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): The table the snapshot
+                was taken of.
+
+        """
+        dealer = table.dealer
+        dealer.deck.restore_state(self.deck_state)
+        for player, hands, hand_state in zip(table.all_players, self.hands, self.hand_states):
+            player.hands = list(hands)
+            player.hand.restore(hand_state)
+        dealer.is_dealer_turn_started = self.is_dealer_turn_started
@@ -0,0 +1,568 @@
+import os
+from functools import lru_cache
+
+from dealer_outcomes import BUST, INFINITE_DECK_PROBABILITIES, dealer_outcomes
+from player import ComputerPlayer
+from rules import DEFAULT_RULES, TIE_RULES, TIES_SHARED, TIES_TO_DEALER, Rules
+
+# A decision table holds one decision code (1-hit, 2-stand) per player
+# total (0 to 21), soft flag (0 or 1) and dealer upcard value (0 to 10,
+# 0 being unused), see DecisionTable.index.
+TABLE_SIZE = 22 * 2 * 11
+
+# The index of a bust in a final score distribution, after the scores 0 to 21.
+BUSTED = 22
+
+# The header of a decision table cache file, followed by the number of
+# opponents, whether the dealer hits a soft 17, the index of the tie rule
+# in TIE_RULES and the TABLE_SIZE decision codes.
+_FILE_MAGIC = b'BJDT2'
+
+
+class DecisionTable:
+    """A compact table of hit/stand decisions.
+
+    Attributes:
+        num_opponents (int): The number of other players the table was
+            solved for, not counting the dealer.
+        decisions (bytes): The decision code of every state, see index.
+        rules (:obj:`Rules`): The rules the table was solved for. Only the
+            dealer and tie rules matter, see suits.
+
+    """
+
+    def __init__(self, num_opponents, decisions, rules=None):
+        """Constructs an instance of DecisionTable.
+
+        Args:
+            num_opponents (int): The number of other players, not counting
+                the dealer.
+            decisions (bytes): The TABLE_SIZE decision codes.
+            rules (:obj:`Rules`, optional): The rules the table was solved
+                for. The rules of the original game if not given.
+
+        Raises:
+            ValueError: If `decisions` does not hold TABLE_SIZE codes.
+
+        """
+        if len(decisions) != TABLE_SIZE:
+            raise ValueError("A decision table must hold {} decisions!".format(TABLE_SIZE))
+        self.num_opponents = num_opponents
+        self.decisions = bytes(decisions)
+        self.rules = DEFAULT_RULES if rules is None else rules
+
+    def suits(self, rules):
+        """Checks whether the table was solved for the dealer and tie rules of a table.
+
+        The number of decks does not matter: the tables are solved for an
+        infinite deck.
+
+        Args:
+            rules (:obj:`Rules`): The rules of the table.
+
+        Returns:
+            bool: True if the table suits the rules, False otherwise.
+
+        """
+        return _same_play(self.rules, rules)
+
+    @staticmethod
+    def index(total, is_soft, upcard_value):
+        """Gets the position of a state in the table.
+
+        Args:
+            total (int): The player's score.
+            is_soft (bool): True if the player's hand is soft, False otherwise.
+            upcard_value (int): The value of the dealer's face-up card.
+
+        Returns:
+            int: The position of the state in DecisionTable.decisions.
+
+        """
+        return (total * 2 + is_soft) * 11 + upcard_value
+
+    def lookup(self, total, is_soft, upcard_value):
+        """Gets the decision for a state.
+
+        Args:
+            total (int): The player's score.
+            is_soft (bool): True if the player's hand is soft, False otherwise.
+            upcard_value (int): The value of the dealer's face-up card.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        """
+        return self.decisions[(total * 2 + is_soft) * 11 + upcard_value]
+
+    def save(self, path):
+        """Writes the table to a cache file, replacing it atomically.
+
+        Readers never see a partly written file, even if several processes
+        save the same table at once.
+
+        Args:
+            path (str): The path of the cache file.
+
+        Raises:
+            OSError: If the file cannot be written.
+
+        """
+        header = bytes([self.num_opponents, bool(self.rules.dealer_hits_soft_17), TIE_RULES.index(self.rules.ties)])
+        # One temporary file per process, so that concurrent writers do not
+        # write into each other's file.
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'wb') as cache_file:
+            cache_file.write(_FILE_MAGIC + header + self.decisions)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load(path):
+        """Reads a table from a cache file.
+
+        Args:
+            path (str): The path of the cache file.
+
+        Returns:
+            :obj:`DecisionTable`: The table read from the file.
+
+        Raises:
+            ValueError: If the file is not a decision table cache file.
+
+        """
+        with open(path, 'rb') as cache_file:
+            content = cache_file.read()
+        start = len(_FILE_MAGIC)
+        if (not content.startswith(_FILE_MAGIC) or len(content) != start + 3 + TABLE_SIZE
+                or content[start + 2] >= len(TIE_RULES)):
+            raise ValueError("Not a decision table cache file: " + path)
+        rules = Rules(dealer_hits_soft_17=bool(content[start + 1]), ties=TIE_RULES[content[start + 2]])
+        return DecisionTable(content[start], content[start + 3:], rules)
+
+    @staticmethod
+    def load_or_solve(num_opponents=1, path=None, rules=None):
+        """Loads the basic strategy from its cache file, solving it if needed.
+
+        A solved table is saved to the cache file. If the file cannot be
+        read or written, e.g. in a read-only directory, the table is solved
+        in memory, which takes a fraction of a second.
+
+        Args:
+            num_opponents (int): The number of other players, not counting
+                the dealer (default to be 1).
+            path (str, optional): The path of the cache file. Defaults to
+                basic_strategy_<num_opponents>_<s17 or h17>_<tie rule>.bin
+                next to this module.
+            rules (:obj:`Rules`, optional): The rules to solve for. The
+                rules of the original game are followed if not given.
+
+        Returns:
+            :obj:`DecisionTable`: The basic strategy.
+
+        Raises:
+            ValueError: If the rules are not supported, see BasicStrategySolver.
+
+        """
+        if rules is None:
+            rules = DEFAULT_RULES
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "basic_strategy_{}_{}_{}.bin".format(
+                num_opponents, 'h17' if rules.dealer_hits_soft_17 else 's17', rules.ties))
+        if os.path.exists(path):
+            try:
+                table = DecisionTable.load(path)
+                if table.num_opponents == num_opponents and table.suits(rules):
+                    return table
+            except (OSError, ValueError):
+                pass
+        table = BasicStrategySolver(num_opponents, rules=rules).solve()
+        try:
+            table.save(path)
+        except OSError:
+            pass
+        return table
+
+
+@lru_cache(maxsize=None)
+def _basic_strategy(dealer_hits_soft_17, blackjack_beats_21, ties):
+    """Loads the basic strategy against one other player once per process.
+
+    Args:
+        dealer_hits_soft_17 (bool): True if the dealer hits a soft 17.
+        blackjack_beats_21 (bool): True if a natural blackjack beats 21.
+        ties (str): The tie rule, one of TIE_RULES.
+
+    Returns:
+        :obj:`DecisionTable`: The basic strategy, see DecisionTable.load_or_solve.
+
+    Raises:
+        ValueError: If the rules are not supported, see BasicStrategySolver.
+
+    """
+    return DecisionTable.load_or_solve(rules=Rules(dealer_hits_soft_17=dealer_hits_soft_17,
+                                                   blackjack_beats_21=blackjack_beats_21, ties=ties))
+
+
+class BasicStrategySolver:
+    """An exact solver of the hit/stand decision under this game's rules.
+
+    There is no betting: a player wants to be among the winners, i.e. not
+    to bust and to have the highest score of the table, ties settled by
+    the tie rule (see Rules.find_winners). The value of a state is
+    therefore the probability of ending as a winner. With shared ties,
+    standing on a score t wins if the dealer ends on a score <= t or busts
+    and every other player does the same; a tie given to the dealer needs
+    the dealer below t, and a tie without winner needs everyone below t.
+
+    Cards are drawn from an infinite deck, so given the dealer's upcard the
+    final scores of the dealer and of the other players are independent.
+    The dealer's distribution comes from dealer_outcomes. The solver can
+    also adapt to the current shoe, e.g. Deck.remaining_counts: the
+    dealer's distribution is then exact for that shoe, and the players
+    draw each value with its probability in the shoe. The other players
+    are assumed to follow the same strategy; it is found by iterating
+    from hitting below 17 until the decisions no longer change.
+
+    Attributes:
+        num_opponents (int): The number of other players, not counting the dealer.
+        max_iterations (int): The maximum number of strategy iterations.
+        composition (tuple): The number of cards of each value (1 to 10)
+            in the shoe, None for an infinite deck.
+        rules (:obj:`Rules`): The rules of the table, whose dealer and tie
+            rules are followed.
+
+    """
+
+    def __init__(self, num_opponents=1, max_iterations=50, composition=None, rules=None):
+        """Constructs an instance of BasicStrategySolver.
+
+        Args:
+            num_opponents (int): The number of other players, not counting
+                the dealer (default to be 1).
+            max_iterations (int): The maximum number of strategy iterations
+                (default to be 50).
+            composition (tuple, optional): The number of cards of each
+                value in the shoe, the dealer's upcard included. An
+                infinite deck is assumed if not given.
+            rules (:obj:`Rules`, optional): The rules of the table. The
+                rules of the original game are followed if not given.
+
+        Raises:
+            ValueError: If a natural blackjack beats 21 under the rules,
+                which the hand states of the solver do not track.
+
+        """
+        if rules is None:
+            rules = DEFAULT_RULES
+        if rules.blackjack_beats_21:
+            raise ValueError("The solver does not support a blackjack that beats 21!")
+        self.num_opponents = num_opponents
+        self.max_iterations = max_iterations
+        self.composition = None if composition is None else tuple(composition)
+        self.rules = rules
+
+    def solve(self):
+        """Solves the decision of every state.
+
+        Returns:
+            :obj:`DecisionTable`: The decision of every state.
+
+        """
+        decisions = bytearray([2]) * TABLE_SIZE
+        for upcard_value in range(1, 11):
+            if self.composition is not None and not self.composition[upcard_value - 1]:
+                continue
+            for (total, is_soft), (stand_value, hit_value) in self.expected_values(upcard_value).items():
+                decisions[DecisionTable.index(total, is_soft, upcard_value)] = 1 if hit_value > stand_value else 2
+        return DecisionTable(self.num_opponents, decisions, self.rules)
+
+    def expected_values(self, upcard_value):
+        """Gets the winning probability of standing and of hitting in every state.
+
+        Args:
+            upcard_value (int): The value of the dealer's face-up card.
+
+        Returns:
+            dict: A (stand, hit) pair of winning probabilities keyed by
+                (player total, soft flag), for every total from 2 to 21.
+
+        Raises:
+            ValueError: If the shoe holds no card of the upcard's value.
+
+        """
+        if self.composition is None:
+            dealer = dealer_outcomes(upcard_value, rules=self.rules)
+            probabilities = INFINITE_DECK_PROBABILITIES
+        else:
+            count = self.composition[upcard_value - 1]
+            if not count:
+                raise ValueError("The shoe holds no card of the upcard's value!")
+            remaining = self.composition[:upcard_value - 1] + (count - 1,) + self.composition[upcard_value:]
+            dealer = dealer_outcomes(upcard_value, remaining, self.rules)
+            probabilities = tuple(count / sum(remaining) for count in remaining)
+        dealer_at_most = [dealer[BUST]] * 22
+        for total in range(17, 22):
+            dealer_at_most[total] = dealer_at_most[total - 1] + dealer[total - 17]
+        # A standing player must beat the scores below, and may tie those
+        # at most equal if the tie rule lets them win it.
+        ties = self.rules.ties
+        dealer_beaten = dealer_at_most if ties == TIES_SHARED else [dealer[BUST]] + dealer_at_most[:-1]
+
+        # Start with opponents that hit below 17.
+        opponent_hits = {(hard_total, has_ace): hand_total(hard_total, has_ace) < 17
+                         for hard_total in range(2, 22) for has_ace in (False, True)}
+        for _ in range(self.max_iterations):
+            opponent = final_distribution(lambda hard_total, has_ace: opponent_hits[(hard_total, has_ace)],
+                                          probabilities)
+            opponent_beaten = scores_at_most(opponent)
+            if ties not in (TIES_SHARED, TIES_TO_DEALER):
+                opponent_beaten = [opponent[BUSTED]] + opponent_beaten[:-1]
+            stand_values = [dealer_beaten[total] * opponent_beaten[total] ** self.num_opponents
+                            for total in range(22)]
+            values = _solve_values(stand_values, probabilities)
+            hits = {state: values[state][1] > values[state][0] for state in opponent_hits}
+            if hits == opponent_hits or self.num_opponents == 0:
+                break
+            opponent_hits = hits
+
+        expected_values = {}
+        for (hard_total, has_ace), pair in values.items():
+            total = hand_total(hard_total, has_ace)
+            expected_values[(total, total != hard_total)] = pair
+        return expected_values
+
+
+def _same_play(rules, other):
+    """Checks whether two rules have the same dealer and tie rules.
+
+    Args:
+        rules (:obj:`Rules`): The first rules.
+        other (:obj:`Rules`): The second rules.
+
+    Returns:
+        bool: True if the same decisions are best under both, False otherwise.
+
+    """
+    return (bool(rules.dealer_hits_soft_17) == bool(other.dealer_hits_soft_17)
+            and bool(rules.blackjack_beats_21) == bool(other.blackjack_beats_21)
+            and rules.ties == other.ties)
+
+
+def hand_total(hard_total, has_ace):
+    """Gets the score of a hand, counting an 'A' as 11 if it fits.
+
+    Args:
+        hard_total (int): The sum of the card values, 'A' counted as 1.
+        has_ace (bool): True if the hand holds an 'A', False otherwise.
+
+    Returns:
+        int: The score of the hand.
+
+    """
+    return hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+
+
+def _solve_values(stand_values, probabilities=INFINITE_DECK_PROBABILITIES):
+    """Gets the winning probability of standing and of hitting in every state.
+
+    Args:
+        stand_values (:obj:`list` of float): The winning probability of
+            standing on each score from 0 to 21.
+        probabilities (tuple): The probability of drawing each value
+            (default to be that of an infinite deck).
+
+    Returns:
+        dict: A (stand, hit) pair keyed by (hard total, has ace), for every
+            hard total from 2 to 21.
+
+    """
+    best = {}
+
+    def value(hard_total, has_ace):
+        """Gets the winning probability of a state under the best decisions."""
+        if hard_total > 21:
+            return 0.0
+        state = (hard_total, has_ace)
+        if state not in best:
+            stand, hit = pair(hard_total, has_ace)
+            best[state] = max(stand, hit)
+        return best[state]
+
+    def pair(hard_total, has_ace):
+        """Gets the winning probability of standing and of hitting in a state."""
+        stand = stand_values[hand_total(hard_total, has_ace)]
+        hit = 0.0
+        for card_value in range(1, 11):
+            hit += probabilities[card_value - 1] * value(hard_total + card_value,
+                                                         has_ace or card_value == 1)
+        return stand, hit
+
+    # Hard totals only grow, so solving from the highest one down keeps the
+    # recursion shallow.
+    pairs = {}
+    for hard_total in range(21, 1, -1):
+        for has_ace in (False, True):
+            pairs[(hard_total, has_ace)] = pair(hard_total, has_ace)
+    return pairs
+
+
+def final_distribution(hit_probability, probabilities=INFINITE_DECK_PROBABILITIES):
+    """Gets the distribution of a player's final score under a strategy.
+
+    The player is dealt two cards, then hits until they stand or bust.
+
+    Args:
+        hit_probability (callable): The probability of hitting, a function
+            of the hard total and of whether the hand holds an 'A'. A
+            strategy returns True or False.
+        probabilities (tuple): The probability of drawing each value
+            (default to be that of an infinite deck).
+
+    Returns:
+        :obj:`list` of float: The probability of each final score from 0
+            to 21, followed by the probability of a bust.
+
+    """
+    finals = {}
+
+    def final(hard_total, has_ace):
+        """Gets the final score distribution from a state."""
+        if hard_total > 21:
+            distribution = [0.0] * (BUSTED + 1)
+            distribution[BUSTED] = 1.0
+            return distribution
+        state = (hard_total, has_ace)
+        if state not in finals:
+            hit = hit_probability(hard_total, has_ace)
+            distribution = [0.0] * (BUSTED + 1)
+            distribution[hand_total(hard_total, has_ace)] = 1.0 - hit
+            if hit:
+                for card_value in range(1, 11):
+                    weight = hit * probabilities[card_value - 1]
+                    if not weight:
+                        continue
+                    outcome = final(hard_total + card_value, has_ace or card_value == 1)
+                    for index in range(BUSTED + 1):
+                        distribution[index] += weight * outcome[index]
+            finals[state] = distribution
+        return finals[state]
+
+    distribution = [0.0] * (BUSTED + 1)
+    for first_value in range(1, 11):
+        for second_value in range(1, 11):
+            probability = probabilities[first_value - 1] * probabilities[second_value - 1]
+            if not probability:
+                continue
+            outcome = final(first_value + second_value, first_value == 1 or second_value == 1)
+            for index in range(BUSTED + 1):
+                distribution[index] += probability * outcome[index]
+    return distribution
+
+
+def scores_at_most(distribution):
+    """Gets the probability of a final score <= each score, or of a bust.
+
+    Args:
+        distribution (:obj:`list` of float): The final score distribution,
+            see final_distribution.
+
+    Returns:
+        :obj:`list` of float: The probability of busting or ending on a
+            score <= t, for every score t from 0 to 21.
+
+    """
+    at_most = []
+    cumulative = distribution[BUSTED]
+    for total in range(BUSTED):
+        cumulative += distribution[total]
+        at_most.append(cumulative)
+    return at_most
+
+
+class StrategyComputerPlayer(ComputerPlayer):
+    """A computer player who follows a decision table.
+
+    Attributes:
+        player_name (str): The name of the player.
+        hands (:obj:`list` of :obj:`Card`): The player's hands of cards.
+        hand (:obj:`HandState`): The value of the player's hands.
+        is_bust (bool): True if the player busts, False otherwise.
+        score (int): The player's score.
+        rng (:obj:`random.Random`): The random number generator, unused.
+        decisions (bytes): The decision codes of the table, see DecisionTable.
+        table_rules (:obj:`Rules`): The rules the table was solved for.
+        follows_basic_strategy (bool): True if the player follows the basic
+            strategy of the table they sit at, False for a given table.
+
+    """
+
+    def __init__(self, player_number, table=None, rng=None):
+        """Constructs an instance of StrategyComputerPlayer.
+
+        Args:
+            player_number (int): The serial number of the player, starting
+                from 1. The serial number is unique among computer players.
+            table (:obj:`DecisionTable`, optional): The decision table. The
+                basic strategy against one other player is followed if not
+                given: that of the rules of the original game, and that of
+                the rules of the table once the player sits at one.
+            rng (:obj:`random.Random`, optional): Not used by the decisions.
+        """
+        super().__init__(player_number, rng)
+        self.follows_basic_strategy = table is None
+        if table is None:
+            table = _basic_strategy(DEFAULT_RULES.dealer_hits_soft_17, DEFAULT_RULES.blackjack_beats_21,
+                                    DEFAULT_RULES.ties)
+        self.decisions = table.decisions
+        self.table_rules = table.rules
+
+    def sit_at(self, table):
+        """Seats the player at a table, whose rules the decision table must suit.
+
+        Args:
+            table (:obj:`Game` or :obj:`Engine`): A table the player is one
+                of the players of.
+
+        Raises:
+            ValueError: If the decision table does not suit the rules of
+                the table, see follow_rules.
+
+        """
+        self.follow_rules(table.rules)
+
+    def follow_rules(self, rules):
+        """Checks that the decision table suits some rules.
+
+        A player who follows the basic strategy switches to that of the
+        rules.
+
+        Args:
+            rules (:obj:`Rules`): The rules the player plays under.
+
+        Raises:
+            ValueError: If the given decision table was solved for other
+                dealer or tie rules, see DecisionTable.suits, or if the
+                basic strategy cannot be solved for them.
+
+        """
+        if _same_play(self.table_rules, rules):
+            return
+        if not self.follows_basic_strategy:
+            raise ValueError("{} follows a table solved for {!r}, not for {!r}!".format(
+                self.player_name, self.table_rules, rules))
+        basic_strategy = _basic_strategy(bool(rules.dealer_hits_soft_17), bool(rules.blackjack_beats_21), rules.ties)
+        self.decisions = basic_strategy.decisions
+        self.table_rules = basic_strategy.rules
+
+    def get_decision(self, dealer_upcard):
+        """Gets the computer player's decision with a single table lookup.
+
+        Args:
+            dealer_upcard (:obj:`Card`): The dealer's face-up card.
+
+        Returns:
+            int: A code of decision, 1 for 'hit', 2 for 'stand'.
+
+        """
+        hand = self.hand
+        return self.decisions[(hand.total * 2 + hand.is_soft) * 11 + dealer_upcard.value]
@@ -0,0 +1,50 @@
+import pytest
+
+from batch import BatchSimulator
+from lookahead import LookaheadComputerPlayer
+from policy import BatchPolicyPlayer
+from rules import TIES_PUSH, TIES_TO_DEALER, Rules
+from strategy import BasicStrategySolver, StrategyComputerPlayer
+
+NUM_ROUNDS = 20000
+
+
+def check_agreement(simulator):
+    """Cross-checks a batch simulator with the engine and reports the rates that disagree."""
+    agree, rows = simulator.cross_check(NUM_ROUNDS)
+    assert agree, [row for row in rows if abs(row[4]) > 4]
+
+
+@pytest.mark.parametrize('num_computer_player, num_decks', [(1, 1), (3, 2)])
+def test_random_policies_agree_with_engine(num_computer_player, num_decks):
+    check_agreement(BatchSimulator(num_computer_player, num_decks, seed=num_computer_player))
+
+
+@pytest.mark.parametrize('rules', [Rules(dealer_hits_soft_17=True),
+                                   Rules(2, blackjack_beats_21=True, ties=TIES_TO_DEALER),
+                                   Rules(ties=TIES_PUSH)])
+def test_random_policies_agree_under_other_rules(rules):
+    check_agreement(BatchSimulator(2, seed=7, rules=rules))
+
+
+def test_table_policies_agree_with_engine():
+    rules = Rules(dealer_hits_soft_17=True, ties=TIES_PUSH)
+    check_agreement(BatchSimulator(2, seed=3, rules=rules,
+                                   policies=[StrategyComputerPlayer(1), BatchPolicyPlayer(2, StrategyComputerPlayer(2))]))
+
+
+def test_batch_rejects_mismatched_tables_and_unsupported_players():
+    table = BasicStrategySolver(1).solve()
+    with pytest.raises(ValueError):
+        BatchSimulator(policies=[table], rules=Rules(ties=TIES_PUSH))
+    with pytest.raises(ValueError):
+        BatchSimulator(policies=[LookaheadComputerPlayer(1)])
+    with pytest.raises(ValueError):
+        BatchSimulator(num_decks=2, rules=Rules(1))
+
+
+def test_batch_is_reproducible():
+    first = BatchSimulator(3, seed=11, batch_size=1000).run(5000)
+    second = BatchSimulator(3, seed=11, batch_size=1000).run(5000)
+    assert first == second
+    assert first.rounds == 5000
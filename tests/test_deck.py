@@ -0,0 +1,114 @@
+import random
+from collections import Counter
+
+import pytest
+
+from card import CARDS
+from deck import HI_LO_TAGS, Deck
+
+
+def undealt_cards(deck):
+    """Gets the cards left to deal, by dealing them from a saved state."""
+    state = deck.save_state()
+    cards = [deck.deal_card() for _ in range(len(deck))]
+    deck.restore_state(state)
+    return cards
+
+
+def check_deck(deck):
+    """Checks that the shoe holds every card once per deck and that its counts match the undealt cards."""
+    assert Counter(card.code for card in deck._cards) == Counter(card.code for card in CARDS * deck.num_decks)
+    undealt = undealt_cards(deck)
+    assert len(undealt) == len(deck)
+    counts = Counter(card.value for card in undealt)
+    assert deck.remaining_counts() == tuple(counts[value] for value in range(1, 11))
+    dealt = Counter(card.code for card in CARDS * deck.num_decks) - Counter(card.code for card in undealt)
+    assert deck.running_count == sum(HI_LO_TAGS[CARDS[code].value] * count for code, count in dealt.items())
+
+
+@pytest.mark.parametrize('num_decks', [1, 2, 6])
+def test_cut_card_reshuffle(num_decks):
+    deck = Deck(num_decks, 0.75, random.Random(num_decks))
+    rng = random.Random(1)
+    reshuffles = 0
+    for _ in range(200):
+        cards_left = len(deck)
+        deck.begin_round(8)
+        if len(deck) > cards_left:
+            reshuffles += 1
+        for _ in range(rng.randint(4, 12)):
+            deck.deal_card()
+        check_deck(deck)
+    assert reshuffles > 0
+
+
+def test_discards_shuffled_back_in():
+    deck = Deck(1, 1.0, random.Random(2))
+    rng = random.Random(3)
+    for _ in range(100):
+        deck.begin_round()
+        in_play = [deck.deal_card() for _ in range(rng.randint(4, 20))]
+        check_deck(deck)
+        # The cards in play stay dealt when the discards are shuffled back in.
+        assert not set(map(id, in_play)) & set(map(id, undealt_cards(deck)))
+
+
+def test_out_of_cards():
+    deck = Deck(1, 1.0, random.Random(4))
+    deck.begin_round()
+    for _ in range(52):
+        deck.deal_card()
+    with pytest.raises(RuntimeError):
+        deck.deal_card()
+
+
+def test_shuffle_undealt():
+    deck = Deck(2, 0.75, random.Random(5))
+    rng = random.Random(6)
+    for _ in range(200):
+        deck.begin_round(8)
+        dealt = [deck.deal_card() for _ in range(rng.randint(2, 10))]
+        unseen_card = rng.choice(dealt)
+        replacement = deck.shuffle_undealt(rng, unseen_card)
+        check_deck(deck)
+        assert deck.shuffle_undealt(rng) is None
+        check_deck(deck)
+        if replacement is not unseen_card:
+            assert unseen_card.code in {card.code for card in undealt_cards(deck)}
+
+
+def test_shuffle_undealt_rejects_discarded_card():
+    deck = Deck(1, 1.0, random.Random(7))
+    deck.begin_round()
+    discarded = deck.deal_card()
+    deck.begin_round()
+    deck.deal_card()
+    with pytest.raises(ValueError):
+        deck.shuffle_undealt(unseen_card=discarded)
+
+
+def test_seeded_round_and_rewind():
+    deck = Deck(2, 0.75, random.Random(8))
+    deck.begin_round(seed=42)
+    first = [deck.deal_card() for _ in range(10)]
+    check_deck(deck)
+    deck.rewind()
+    check_deck(deck)
+    assert [deck.deal_card() for _ in range(10)] == first
+    other = Deck(2, 0.75, random.Random(9))
+    other.begin_round(seed=42)
+    assert [other.deal_card() for _ in range(10)] == first
+
+
+def test_save_and_restore_state():
+    deck = Deck(1, 0.75, random.Random(10))
+    deck.begin_round()
+    deck.deal_card()
+    state = deck.save_state()
+    expected = undealt_cards(deck)
+    for _ in range(5):
+        deck.deal_card()
+    deck.shuffle_undealt()
+    deck.restore_state(state)
+    check_deck(deck)
+    assert undealt_cards(deck) == expected
@@ -0,0 +1,67 @@
+import itertools
+import random
+
+from card import CARDS
+from hand import HandState
+
+# A card of each value, from 1 ('A') to 10.
+CARD_OF_VALUE = {card.value: card for card in reversed(CARDS)}
+
+
+def brute_force_score(cards):
+    """Scores a hand by trying every value of every 'A'.
+
+    Returns:
+        tuple: The best total, i.e. the highest one not above 21 or the
+            lowest one if every total busts, and whether an 'A' is counted
+            as 11 in it.
+
+    """
+    num_aces = sum(card.is_ace for card in cards)
+    hard_total = sum(card.value for card in cards)
+    totals = [(hard_total + 10 * num_elevens, num_elevens > 0) for num_elevens in range(num_aces + 1)]
+    not_bust = [total for total in totals if total[0] <= 21]
+    return max(not_bust) if not_bust else min(totals)
+
+
+def check_hand(cards):
+    """Adds the cards one by one and compares every state with the brute-force scorer."""
+    hand = HandState()
+    for count, card in enumerate(cards, 1):
+        hand.add(card)
+        total, is_soft = brute_force_score(cards[:count])
+        assert hand.total == total
+        assert hand.is_soft == is_soft
+        assert hand.is_bust == (total > 21)
+        assert hand.is_blackjack == (count == 2 and total == 21)
+        assert hand.num_cards == count
+        assert hand.hard_total == sum(card.value for card in cards[:count])
+
+
+def test_every_hand_of_up_to_four_values():
+    for length in range(1, 5):
+        for values in itertools.product(range(1, 11), repeat=length):
+            check_hand([CARD_OF_VALUE[value] for value in values])
+
+
+def test_random_long_hands():
+    rng = random.Random(0)
+    for _ in range(2000):
+        check_hand([rng.choice(CARDS) for _ in range(rng.randint(5, 12))])
+
+
+def test_many_aces():
+    check_hand([CARD_OF_VALUE[1]] * 21)
+
+
+def test_reset_and_restore():
+    hand = HandState()
+    for card in (CARD_OF_VALUE[1], CARD_OF_VALUE[6]):
+        hand.add(card)
+    state = hand.save()
+    hand.add(CARD_OF_VALUE[10])
+    assert (hand.total, hand.is_soft) == (17, False)
+    hand.restore(state)
+    assert (hand.total, hand.is_soft, hand.num_cards) == (17, True, 2)
+    hand.reset()
+    assert (hand.total, hand.num_cards, hand.is_bust, hand.is_blackjack) == (0, 0, False, False)
@@ -0,0 +1,63 @@
+import pytest
+
+from engine import Engine
+from record import RoundRecord, load_records, save_records
+from replay import Replayer
+from rules import TIES_TO_DEALER, Rules
+
+
+def play_recorded(engine, num_rounds):
+    """Plays recorded rounds and gets their results and records."""
+    results = list(engine.play_rounds(num_rounds))
+    return results, [result.to_record(engine.rules.num_decks) for result in results]
+
+
+@pytest.mark.parametrize('num_seats, num_decks', [(1, 1), (3, 2), (7, 6)])
+def test_replay_matches_the_recorded_round(num_seats, num_decks):
+    engine = Engine(num_seats, num_decks=num_decks, seed=num_seats, record=True)
+    results, records = play_recorded(engine, 300)
+    replayer = Replayer()
+    for result, record in zip(results, records):
+        replayed = replayer.replay(record)
+        assert replayed.scores == result.scores
+        assert replayed.busts == result.busts
+        assert [[card.code for card in cards] for cards in replayed.cards] == \
+            [[card.code for card in cards] for cards in result.cards]
+        assert replayed.hits == result.hits
+    assert replayer.verify(records) == []
+
+
+def test_replay_under_other_rules():
+    rules = Rules(2, dealer_hits_soft_17=True, blackjack_beats_21=True, ties=TIES_TO_DEALER)
+    engine = Engine(3, seed=5, record=True, rules=rules)
+    results, records = play_recorded(engine, 300)
+    replayer = Replayer(rules)
+    assert replayer.verify(records) == []
+    for result, record in zip(results, records):
+        replayed = replayer.replay(record)
+        # The seats of the replayed round are named after their numbers.
+        assert [replayed.player_names.index(winner) for winner in replayed.winners] == \
+            [result.player_names.index(winner) for winner in result.winners]
+
+
+def test_log_round_trip(tmp_path):
+    engine = Engine(2, num_decks=2, seed=9, record=True)
+    _, records = play_recorded(engine, 100)
+    path = str(tmp_path / 'rounds.log')
+    save_records(path, records)
+    loaded = list(load_records(path))
+    assert loaded == records
+    assert Replayer().verify(loaded) == []
+
+
+def test_verify_finds_altered_records():
+    engine = Engine(2, seed=3, record=True)
+    _, records = play_recorded(engine, 50)
+    altered = RoundRecord(records[7].seed, 1, records[7].hits, [score + 1 for score in records[7].scores])
+    assert Replayer().verify(records[:7] + [altered]) == [7]
+
+
+def test_round_without_seed_cannot_be_recorded():
+    engine = Engine(1, seed=0)
+    with pytest.raises(ValueError):
+        engine.play_round().to_record(1)
@@ -0,0 +1,468 @@
+import argparse
+import multiprocessing
+import os
+import random
+
+from engine import Engine
+from player import ComputerPlayer
+from rules import resolve_rules
+from strategy import StrategyComputerPlayer
+
+# The counters kept per policy, in the order of the shared-memory summary.
+SUMMARY_FIELDS = ('rounds', 'wins', 'ties', 'busts', 'score_total')
+
+# The policies seats are assigned from, keyed by name. A policy is a
+# function creating a player from a player number and a random number
+# generator, as ComputerPlayer does. It must be defined at the top level
+# of a module, so that worker processes can find it.
+POLICIES = {}
+
+
+def register_policy(name, factory):
+    """Adds a policy to the pool of registered policies.
+
+    Args:
+        name (str): The name of the policy, as shown on the leaderboard.
+        factory (callable): The function creating a player of the policy,
+            from a player number and a random number generator.
+
+    Raises:
+        ValueError: If a policy of the same name is already registered.
+
+    """
+    if name in POLICIES:
+        raise ValueError("A policy named {!r} is already registered!".format(name))
+    POLICIES[name] = factory
+
+
+def basic_strategy_player(player_number, rng=None):
+    """Creates a computer player who follows the basic strategy.
+
+    The player switches to the basic strategy of the rules of the table
+    once seated, see StrategyComputerPlayer.sit_at.
+
+    Args:
+        player_number (int): The serial number of the player, starting from 1.
+        rng (:obj:`random.Random`, optional): Not used by the decisions.
+
+    Returns:
+        :obj:`StrategyComputerPlayer`: The player.
+
+    """
+    return StrategyComputerPlayer(player_number, rng=rng)
+
+
+register_policy('random', ComputerPlayer)
+register_policy('basic_strategy', basic_strategy_player)
+
+
+class PolicyRecord:
+    """The mergeable results of a policy, over every seat it played.
+
+    Attributes:
+        rounds (int): The number of rounds played by the policy, one per
+            seat and round.
+        wins (int): The number of rounds the policy won alone.
+        ties (int): The number of rounds the policy shared the highest
+            score with other players.
+        busts (int): The number of rounds the policy busted.
+        score_total (int): The sum of the policy's final scores.
+
+    """
+    __slots__ = SUMMARY_FIELDS
+
+    def __init__(self, counts=(0, 0, 0, 0, 0)):
+        """Constructs an instance of PolicyRecord.
+
+        Args:
+            counts (tuple): The counters, in the order of SUMMARY_FIELDS
+                (default to be all 0).
+
+        """
+        self.rounds, self.wins, self.ties, self.busts, self.score_total = counts
+
+    def counts(self):
+        """Gets the counters.
+
+        Returns:
+            tuple: The counters, in the order of SUMMARY_FIELDS.
+
+        """
+        return self.rounds, self.wins, self.ties, self.busts, self.score_total
+
+    def merge(self, other):
+        """Adds the counters of another instance of PolicyRecord to this one.
+
+        Args:
+            other (:obj:`PolicyRecord`): The results to add.
+
+        """
+        self.rounds += other.rounds
+        self.wins += other.wins
+        self.ties += other.ties
+        self.busts += other.busts
+        self.score_total += other.score_total
+
+    @property
+    def points(self):
+        """float: The points per round, 1 for a sole win and 0.5 for a tie."""
+        return (self.wins + self.ties / 2) / self.rounds if self.rounds else 0.0
+
+    @property
+    def average_score(self):
+        """float: The average final score."""
+        return self.score_total / self.rounds if self.rounds else 0.0
+
+    def __eq__(self, other):
+        """Checks whether two instances of PolicyRecord hold the same counters.
+
+        Returns:
+            bool: True if all counters are equal, False otherwise.
+
+        """
+        return isinstance(other, PolicyRecord) and self.counts() == other.counts()
+
+
+class Standings:
+    """The results of every policy of a tournament.
+
+    Standings of separate groups of tables can be merged. Every counter is
+    a plain sum, so the merged standings do not depend on how the tables
+    were split between workers.
+
+    Attributes:
+        policy_names (:obj:`list` of :obj:`str`): The names of the policies.
+        tables (int): The number of tables played.
+        records (dict): The :obj:`PolicyRecord` of each policy, keyed by name.
+
+    """
+
+    def __init__(self, policy_names):
+        """Constructs an empty instance of Standings.
+
+        Args:
+            policy_names (:obj:`list` of :obj:`str`): The names of the policies.
+
+        """
+        self.policy_names = list(policy_names)
+        self.tables = 0
+        self.records = {name: PolicyRecord() for name in policy_names}
+
+    def add_round(self, result, seat_records):
+        """Adds the outcome of one round.
+
+        Args:
+            result (:obj:`RoundResult`): The outcome of the round.
+            seat_records (:obj:`list` of :obj:`PolicyRecord`): The record
+                of the policy of each seat, the dealer excluded.
+
+        """
+        winners = result.winners
+        is_tie = len(winners) > 1
+        for index, record in enumerate(seat_records):
+            record.rounds += 1
+            record.score_total += result.scores[index]
+            if result.busts[index]:
+                record.busts += 1
+            elif result.player_names[index] in winners:
+                if is_tie:
+                    record.ties += 1
+                else:
+                    record.wins += 1
+
+    def merge(self, other):
+        """Adds the results of another instance of Standings to this one.
+
+        Args:
+            other (:obj:`Standings`): The standings to merge, of the same policies.
+
+        Raises:
+            ValueError: If the policies differ.
+
+        """
+        if other.policy_names != self.policy_names:
+            raise ValueError("Cannot merge standings of different policies!")
+        self.tables += other.tables
+        for name in self.policy_names:
+            self.records[name].merge(other.records[name])
+
+    def summary(self):
+        """Flattens the standings into the layout of the shared-memory summary.
+
+        Returns:
+            :obj:`list` of int: The number of tables, followed by the
+                counters of each policy, in the order of SUMMARY_FIELDS.
+
+        """
+        summary = [self.tables]
+        for name in self.policy_names:
+            summary.extend(self.records[name].counts())
+        return summary
+
+    @staticmethod
+    def from_summary(policy_names, summary):
+        """Rebuilds standings from a shared-memory summary.
+
+        Args:
+            policy_names (:obj:`list` of :obj:`str`): The names of the policies.
+            summary (sequence of int): The summary, see Standings.summary.
+
+        Returns:
+            :obj:`Standings`: The standings.
+
+        """
+        standings = Standings(policy_names)
+        standings.tables = summary[0]
+        width = len(SUMMARY_FIELDS)
+        for index, name in enumerate(policy_names):
+            start = 1 + index * width
+            standings.records[name] = PolicyRecord(tuple(summary[start:start + width]))
+        return standings
+
+    def leaderboard(self):
+        """Ranks the policies by points per round.
+
+        Returns:
+            :obj:`list` of tuple: The name and the :obj:`PolicyRecord` of
+                each policy, the best first.
+
+        """
+        return sorted(self.records.items(), key=lambda item: item[1].points, reverse=True)
+
+    def __eq__(self, other):
+        """Checks whether two instances of Standings hold the same results.
+
+        Returns:
+            bool: True if all counters are equal, False otherwise.
+
+        """
+        return isinstance(other, Standings) and self.summary() == other.summary()
+
+    def __str__(self):
+        """Represents the leaderboard as string.
+
+        Returns:
+            str: One line per policy, the best first, with their rates.
+
+        """
+        lines = ["Tables: {}".format(self.tables)]
+        for rank, (name, record) in enumerate(self.leaderboard(), 1):
+            rounds = max(record.rounds, 1)
+            lines.append("{}. {}: points {:.4f}, win {:.4f}, tie {:.4f}, bust {:.4f}, average score {:.2f}".format(
+                rank, name, record.points, record.wins / rounds, record.ties / rounds, record.busts / rounds,
+                record.average_score))
+        return '\n'.join(lines)
+
+
+# The shared-memory summary of the worker process, see _init_worker.
+_summary = None
+
+
+def _init_worker(summary):
+    """Keeps the shared-memory summary in a worker process.
+
+    Args:
+        summary (:obj:`multiprocessing.Array`): The summary of the tournament.
+
+    """
+    global _summary
+    _summary = summary
+
+
+def _publish(standings):
+    """Adds the standings of a table to the shared-memory summary, if any.
+
+    Args:
+        standings (:obj:`Standings`): The standings of the table.
+
+    """
+    if _summary is None:
+        return
+    with _summary.get_lock():
+        for index, count in enumerate(standings.summary()):
+            _summary[index] += count
+
+
+def _play_tables(task):
+    """Plays a group of tables. Runs in a worker process.
+
+    Every table picks the policy of each seat from the pool with its own
+    generator, then plays its rounds. The standings of each table are
+    published to the shared-memory summary as soon as the table is over.
+
+    Args:
+        task (tuple): The seeds of the tables, the number of rounds per
+            table, the number of seats, the policies, the penetration and
+            the rules.
+
+    Returns:
+        :obj:`Standings`: The standings of the tables.
+
+    """
+    seeds, num_rounds, num_seats, policies, penetration, rules = task
+    policy_names = list(policies)
+    standings = Standings(policy_names)
+    for seed in seeds:
+        table_rng = random.Random(seed)
+        seat_policies = [table_rng.choice(policy_names) for _ in range(num_seats)]
+        players = [policies[name](number, table_rng) for number, name in enumerate(seat_policies, 1)]
+        engine = Engine(players=players, penetration=penetration, seed=table_rng.getrandbits(64), rules=rules)
+
+        table_standings = Standings(policy_names)
+        table_standings.tables = 1
+        seat_records = [table_standings.records[name] for name in seat_policies]
+        for result in engine.play_rounds(num_rounds):
+            table_standings.add_round(result, seat_records)
+        _publish(table_standings)
+        standings.merge(table_standings)
+    return standings
+
+
+class Tournament:
+    """A tournament of computer player policies over many tables.
+
+    Each table seats players whose policies are drawn from the pool, and
+    plays a number of rounds. The tables are split into groups of a fixed
+    size, played by a pool of worker processes. Every table's seed is
+    drawn from the master seed, so the standings do not depend on the
+    number of workers.
+
+    While the tournament runs, the workers add the results of each table
+    they finish to a summary held in shared memory, which the main process
+    reads to refresh a live leaderboard. The final standings are merged
+    from the results the workers return.
+
+    Attributes:
+        policies (dict): The policies of the pool, keyed by name, see POLICIES.
+        num_seats (int): The number of players per table, the dealer excluded.
+        num_decks (int): The number of decks in each shoe.
+        penetration (float): The fraction of the shoe dealt before reshuffling.
+        seed (int): The master seed.
+        tables_per_task (int): The number of tables per group.
+        rules (:obj:`Rules`): The rules of every table.
+
+    """
+
+    def __init__(self, policies=None, num_seats=3, num_decks=None, penetration=0.75, seed=0, tables_per_task=10,
+                 rules=None):
+        """Constructs an instance of Tournament.
+
+        Args:
+            policies (dict, optional): The policies of the pool, keyed by
+                name. Every registered policy is in the pool if not given.
+            num_seats (int): The number of players per table (default to be 3).
+            num_decks (int, optional): The number of decks in each shoe.
+                Defaults to the number of decks of `rules`, or 1.
+            penetration (float): The fraction of the shoe dealt before
+                reshuffling (default to be 0.75).
+            seed (int): The master seed (default to be 0).
+            tables_per_task (int): The number of tables per group (default
+                to be 10).
+            rules (:obj:`Rules`, optional): The rules of every table. The
+                rules of the original game with `num_decks` decks are
+                followed if not given.
+
+        Raises:
+            ValueError: If the pool is empty, if there is no seat, or if
+                `num_decks` is not the number of decks of `rules`.
+
+        """
+        self.policies = dict(POLICIES if policies is None else policies)
+        if not self.policies:
+            raise ValueError("The tournament needs at least one policy!")
+        if num_seats < 1:
+            raise ValueError("The table must have at least one player!")
+        self.rules = resolve_rules(num_decks, rules)
+        self.num_seats = num_seats
+        self.num_decks = self.rules.num_decks
+        self.penetration = penetration
+        self.seed = seed
+        self.tables_per_task = tables_per_task
+
+    def _tasks(self, num_tables, rounds_per_table):
+        """Splits the tables into groups, each table with its own derived seed.
+
+        Args:
+            num_tables (int): The number of tables.
+            rounds_per_table (int): The number of rounds per table.
+
+        Returns:
+            :obj:`list` of tuple: The arguments of _play_tables for each group.
+
+        """
+        seeds = random.Random(self.seed)
+        table_seeds = [seeds.getrandbits(64) for _ in range(num_tables)]
+        return [(table_seeds[start:start + self.tables_per_task], rounds_per_table, self.num_seats, self.policies,
+                 self.penetration, self.rules)
+                for start in range(0, num_tables, self.tables_per_task)]
+
+    def run(self, num_tables, rounds_per_table=100, num_workers=None, on_update=None, refresh=1.0):
+        """Plays the tournament.
+
+        Args:
+            num_tables (int): The number of tables.
+            rounds_per_table (int): The number of rounds per table (default
+                to be 100).
+            num_workers (int, optional): The number of worker processes.
+                Defaults to the number of CPUs. With 1 worker, the tables
+                are played in the current process.
+            on_update (callable, optional): Called with the live
+                :obj:`Standings` about every `refresh` seconds, and once
+                more with the final standings.
+            refresh (float): The seconds between two updates (default to be 1).
+
+        Returns:
+            :obj:`Standings`: The merged standings of all tables.
+
+        """
+        policy_names = list(self.policies)
+        tasks = self._tasks(num_tables, rounds_per_table)
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+
+        standings = Standings(policy_names)
+        if num_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                standings.merge(_play_tables(task))
+                if on_update is not None:
+                    on_update(standings)
+            return standings
+
+        summary = multiprocessing.Array('q', len(standings.summary()))
+        with multiprocessing.Pool(min(num_workers, len(tasks)), _init_worker, (summary,)) as pool:
+            pending = pool.map_async(_play_tables, tasks)
+            while not pending.ready():
+                pending.wait(refresh)
+                if on_update is not None:
+                    with summary.get_lock():
+                        counts = summary[:]
+                    on_update(Standings.from_summary(policy_names, counts))
+            for task_standings in pending.get():
+                standings.merge(task_standings)
+        if on_update is not None:
+            on_update(standings)
+        return standings
+
+
+def main(argv=None):
+    """Runs a tournament of the registered policies from the command line."""
+    parser = argparse.ArgumentParser(description="Runs a tournament of the registered computer player policies.")
+    parser.add_argument('--tables', type=int, default=1000, help="The number of tables.")
+    parser.add_argument('--rounds', type=int, default=100, help="The number of rounds per table.")
+    parser.add_argument('--seats', type=int, default=3, help="The number of players per table.")
+    parser.add_argument('--decks', type=int, default=1, help="The number of decks in each shoe.")
+    parser.add_argument('--workers', type=int, help="The number of worker processes.")
+    parser.add_argument('--seed', type=int, default=0, help="The master seed.")
+    parser.add_argument('--refresh', type=float, default=1.0, help="The seconds between two leaderboard updates.")
+    args = parser.parse_args(argv)
+
+    def show(standings):
+        """Prints the live leaderboard."""
+        print(standings, end='\n\n', flush=True)
+
+    tournament = Tournament(num_seats=args.seats, num_decks=args.decks, seed=args.seed)
+    tournament.run(args.tables, args.rounds, args.workers, show, args.refresh)
+
+
+if __name__ == '__main__':
+    main()